@@ -1,13 +1,73 @@
 """
 Authentication Middleware
 Protects endpoints except public ones (login, redirects)
+
+Implemented as a plain ASGI middleware: no Request object, no body
+stream wrapping, no extra task per request.
 """
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+import re
+
 from api.auth_router import is_valid_token
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+# Exact paths that are public (set lookup per request)
+PUBLIC_PATHS = frozenset({
+    "/",  # Health check
+    "/docs",
+    "/openapi.json",
+    "/redoc",
+})
+
+# Anything starting with this is public (/auth/* login, verify, logout)
+PUBLIC_PREFIX = "/auth"
+
+# One non-empty segment, empty segments ignored ("/abc/", "//abc").
+# fullmatch() returns None without allocating for protected paths.
+_SINGLE_SEGMENT_RE = re.compile(r"/*[^/]+/*")
+
+
+def is_public(method: str, path: str) -> bool:
+    """
+    Classify a request as public without allocating per request
+
+    Public: OPTIONS (CORS preflight), PUBLIC_PATHS, PUBLIC_PREFIX, or a GET
+    with exactly one non-empty segment /{short_code} (redirects; empty
+    segments are ignored, so "/abc/" counts as "/abc").
+    """
+    if method == "OPTIONS" or path in PUBLIC_PATHS or path.startswith(PUBLIC_PREFIX):
+        return True
+    if method != "GET":
+        return False
+    # "/abc123" (the redirect hot path): a single find(), no allocation
+    if len(path) > 1 and path.find("/", 1) == -1:
+        return True
+    return _SINGLE_SEGMENT_RE.fullmatch(path) is not None
+
+
+# Pre-built 401 bodies and headers (no serialization per rejection).
+# CORS headers are added by the outer CORSMiddleware, which mutates the
+# start message's header list in place - so each send gets a fresh list.
+def _unauthorized_response(body: bytes) -> tuple:
+    """Build the (headers, body) pair for a 401 JSON response"""
+    headers = (
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    )
+    return headers, body
+
+
+_UNAUTH_MISSING = _unauthorized_response(b'{"detail":"Authentication required"}')
+_UNAUTH_INVALID = _unauthorized_response(b'{"detail":"Invalid or expired token"}')
+
+
+async def _send_unauthorized(send, response: tuple) -> None:
+    """Send a prebuilt 401 response"""
+    headers, body = response
+    await send({"type": "http.response.start", "status": 401, "headers": list(headers)})
+    await send({"type": "http.response.body", "body": body})
+
+
+class AuthMiddleware:
     """
     Middleware that checks for valid authentication token
     Excepts:
@@ -17,64 +77,32 @@ class AuthMiddleware(BaseHTTPMiddleware):
     - /docs, /redoc (API documentation)
     """
 
-    async def dispatch(self, request: Request, call_next):
-        # Allow all OPTIONS requests (CORS preflight)
-        if request.method == "OPTIONS":
-            return await call_next(request)
-
-        # List of public paths that don't require authentication
-        public_paths = [
-            "/",  # Health check
-            "/docs",
-            "/openapi.json",
-            "/redoc",
-        ]
-
-        # Check if path is public
-        if request.url.path in public_paths:
-            return await call_next(request)
-
-        # Allow /auth/* endpoints (login, verify, logout)
-        if request.url.path.startswith("/auth"):
-            return await call_next(request)
-
-        # Allow redirect endpoints /{short_code} (GET only)
-        # Pattern: single path segment, no slashes
-        path_segments = [p for p in request.url.path.split("/") if p]
-        if len(path_segments) == 1 and request.method == "GET":
-            # This is a redirect path like /abc123
-            return await call_next(request)
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Only HTTP requests are authenticated (lifespan, websockets pass through)
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # Redirects, health check, docs, /auth/* and preflights pass through
+        if is_public(scope["method"], scope["path"]):
+            return await self.app(scope, receive, send)
 
         # All other endpoints require authentication
-        authorization = request.headers.get("authorization")
-
-        if not authorization or not authorization.startswith("Bearer "):
-            from fastapi.responses import JSONResponse
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Authentication required"},
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Credentials": "true",
-                    "Access-Control-Allow-Methods": "*",
-                    "Access-Control-Allow-Headers": "*",
-                }
-            )
-
-        token = authorization.replace("Bearer ", "")
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value
+                break
+
+        if not authorization or authorization[:7] != b"Bearer ":
+            return await _send_unauthorized(send, _UNAUTH_MISSING)
+
+        token = authorization[7:].decode("latin-1")
 
         if not is_valid_token(token):
-            from fastapi.responses import JSONResponse
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Invalid or expired token"},
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Credentials": "true",
-                    "Access-Control-Allow-Methods": "*",
-                    "Access-Control-Allow-Headers": "*",
-                }
-            )
+            return await _send_unauthorized(send, _UNAUTH_INVALID)
 
         # Token is valid, proceed
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -2,21 +2,38 @@
 Authentication Router - Simple password-based auth
 """
 import os
+import hmac
 import hashlib
 import secrets
 from datetime import datetime, timedelta
+from cachetools import TTLCache
+from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException, Header
 from pydantic import BaseModel
 
+# Load environment variables
+load_dotenv()
+
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Token expiration time (24 hours)
+TOKEN_EXPIRY = timedelta(hours=24)
+
+# Max tokens kept in memory (oldest are evicted first)
+TOKEN_CACHE_MAX = int(os.getenv("AUTH_TOKEN_CACHE_MAX", "100000"))
+
 # Simple in-memory token storage (para MVP)
 # En producción usarías Redis o una DB
-valid_tokens = set()
+# Bounded LRU with TTL: tokens expire after TOKEN_EXPIRY without use
+# (each successful check re-inserts the key, restarting its TTL).
+# Keys are 16-byte BLAKE2b digests of the token (see _token_key), so raw
+# tokens are never held in memory.
+# Only touched from the event loop thread, so no lock is needed.
+valid_tokens = TTLCache(maxsize=TOKEN_CACHE_MAX, ttl=TOKEN_EXPIRY.total_seconds())
 
-# Token expiration time (24 hours)
-TOKEN_EXPIRY = timedelta(hours=24)
+# Password is read and encoded once at import, not on every login
+_AUTH_PASSWORD = os.getenv("AUTH_PASSWORD", "").encode("utf-8")
 
 
 class LoginRequest(BaseModel):
@@ -29,13 +46,23 @@ class LoginResponse(BaseModel):
 
 
 def generate_token() -> str:
-    """Generate a random secure token"""
-    return secrets.token_urlsafe(32)
+    """Generate a random secure token (128 bits; stored hashed, revocable server-side)"""
+    return secrets.token_urlsafe(16)
+
+
+def _token_key(token: str) -> bytes:
+    """Fixed-size digest used as the token storage key"""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
 
 
 def is_valid_token(token: str) -> bool:
-    """Check if token exists in valid tokens"""
-    return token in valid_tokens
+    """Check if token exists in valid tokens (and hasn't expired); slides its TTL"""
+    key = _token_key(token)
+    if key not in valid_tokens:
+        return False
+    # Re-set so active sessions only expire after TOKEN_EXPIRY idle
+    valid_tokens[key] = True
+    return True
 
 
 @router.post("/login", response_model=LoginResponse)
@@ -45,16 +72,14 @@ async def login(credentials: LoginRequest):
 
     Password is stored in AUTH_PASSWORD environment variable
     """
-    auth_password = os.getenv("AUTH_PASSWORD")
-
-    if not auth_password:
+    if not _AUTH_PASSWORD:
         raise HTTPException(
             status_code=500,
             detail="Server configuration error"
         )
 
-    # Validate password
-    if credentials.password != auth_password:
+    # Validate password (constant-time comparison)
+    if not hmac.compare_digest(credentials.password.encode("utf-8"), _AUTH_PASSWORD):
         raise HTTPException(
             status_code=401,
             detail="Invalid password"
@@ -62,7 +87,7 @@ async def login(credentials: LoginRequest):
 
     # Generate token
     token = generate_token()
-    valid_tokens.add(token)
+    valid_tokens[_token_key(token)] = True
 
     print(f"✅ User logged in successfully - Token: {token[:10]}...")
 
@@ -77,13 +102,13 @@ async def verify_token(authorization: str = Header(None)):
     """
     Verify if a token is valid
     """
-    if not authorization or not authorization.startswith("Bearer "):
+    if not authorization or authorization[:7] != "Bearer ":
         raise HTTPException(
             status_code=401,
             detail="Missing or invalid authorization header"
         )
 
-    token = authorization.replace("Bearer ", "")
+    token = authorization[7:]
 
     if not is_valid_token(token):
         raise HTTPException(
@@ -99,16 +124,15 @@ async def logout(authorization: str = Header(None)):
     """
     Logout - invalidate token
     """
-    if not authorization or not authorization.startswith("Bearer "):
+    if not authorization or authorization[:7] != "Bearer ":
         raise HTTPException(
             status_code=401,
             detail="Missing authorization header"
         )
 
-    token = authorization.replace("Bearer ", "")
+    token = authorization[7:]
 
-    if token in valid_tokens:
-        valid_tokens.remove(token)
+    if valid_tokens.pop(_token_key(token), None):
         print(f"✅ User logged out - Token invalidated")
 
     return {"message": "Logged out successfully"}
@@ -3,7 +3,9 @@ Folders API Router - Endpoints para organización de URLs
 """
 from fastapi import APIRouter, HTTPException, status
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+
+from api.responses import ORJSONResponse, response_fields
 
 # Importar service (será singleton en main.py)
 folder_service = None
@@ -11,6 +13,8 @@ folder_service = None
 
 # Request/Response models
 class FolderCreate(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     name: str
     color: str = "#00fff5"
     icon: str = "📁"
@@ -18,6 +22,8 @@ class FolderCreate(BaseModel):
 
 
 class FolderUpdate(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     name: Optional[str] = None
     color: Optional[str] = None
     icon: Optional[str] = None
@@ -36,7 +42,13 @@ class FolderResponse(BaseModel):
     subfolder_count: int = 0
 
 
+# Same fields the response_model used to filter to
+_folder_response = response_fields(FolderResponse)
+
+
 class AssignLinkRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     url_id: str
     folder_id: str
 
@@ -45,8 +57,16 @@ class AssignLinkRequest(BaseModel):
 router = APIRouter(prefix="/folders", tags=["folders"])
 
 
-@router.post("/", response_model=FolderResponse, status_code=status.HTTP_201_CREATED)
-async def create_folder(folder_data: FolderCreate):
+# Services already return well-formed dicts, so endpoints skip response_model
+# revalidation (only filter to the model's keys); the models are kept in
+# `responses` for the OpenAPI docs.
+@router.post(
+    "/",
+    response_model=None,
+    responses={201: {"model": FolderResponse}},
+    status_code=status.HTTP_201_CREATED
+)
+async def create_folder(folder_data: FolderCreate) -> dict:
     """
     Create new folder
 
@@ -64,13 +84,13 @@ async def create_folder(folder_data: FolderCreate):
         )
         folder["link_count"] = 0
         folder["subfolder_count"] = 0
-        return folder
+        return _folder_response(folder)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[FolderResponse])
-async def get_all_folders():
+@router.get("/", response_model=None, responses={200: {"model": List[FolderResponse]}})
+async def get_all_folders() -> ORJSONResponse:
     """
     Get all folders with analytics
 
@@ -79,7 +99,7 @@ async def get_all_folders():
     - subfolder_count: Number of subfolders
     """
     folders = folder_service.get_all_folders()
-    return folders
+    return ORJSONResponse(content=[_folder_response(folder) for folder in folders])
 
 
 @router.get("/tree")
@@ -96,8 +116,8 @@ async def get_folder_tree():
     return {"folders": tree}
 
 
-@router.get("/{folder_id}", response_model=FolderResponse)
-async def get_folder(folder_id: str):
+@router.get("/{folder_id}", response_model=None, responses={200: {"model": FolderResponse}})
+async def get_folder(folder_id: str) -> dict:
     """Get folder by ID"""
     folder = folder_service.get_folder(folder_id)
     if not folder:
@@ -105,15 +125,12 @@ async def get_folder(folder_id: str):
 
     folder_data = folder.copy()
     folder_data["link_count"] = len(folder_service.get_folder_links(folder_id))
-    folder_data["subfolder_count"] = sum(
-        1 for f in folder_service.folders.values()
-        if f.get("parent_folder_id") == folder_id
-    )
-    return folder_data
+    folder_data["subfolder_count"] = folder_service.get_subfolder_count(folder_id)
+    return _folder_response(folder_data)
 
 
-@router.patch("/{folder_id}", response_model=FolderResponse)
-async def update_folder(folder_id: str, folder_data: FolderUpdate):
+@router.patch("/{folder_id}", response_model=None, responses={200: {"model": FolderResponse}})
+async def update_folder(folder_id: str, folder_data: FolderUpdate) -> dict:
     """
     Update folder properties
 
@@ -131,11 +148,8 @@ async def update_folder(folder_id: str, folder_data: FolderUpdate):
             parent_folder_id=folder_data.parent_folder_id
         )
         folder["link_count"] = len(folder_service.get_folder_links(folder_id))
-        folder["subfolder_count"] = sum(
-            1 for f in folder_service.folders.values()
-            if f.get("parent_folder_id") == folder_id
-        )
-        return folder
+        folder["subfolder_count"] = folder_service.get_subfolder_count(folder_id)
+        return _folder_response(folder)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -209,14 +223,6 @@ async def get_folder_analytics(folder_id: str):
     - Country breakdown
     """
     try:
-        # Import global data from main
-        from main import urls, clicks
-
-        analytics = folder_service.get_folder_analytics(
-            folder_id=folder_id,
-            urls_data=urls,
-            clicks_data=clicks
-        )
-        return analytics
+        return folder_service.get_folder_analytics(folder_id=folder_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
@@ -1,17 +1,57 @@
 """
 Video Projects API Router - Endpoints for video-centric organization
 """
+import asyncio
+import time
+
 from fastapi import APIRouter, HTTPException, status
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+
+from api.responses import ORJSONResponse, response_fields
 
 # Import service (será singleton en main.py)
 video_project_service = None
 
+# Background materialized-view refresh (one in flight, bursts coalesced)
+_refresh_task: Optional[asyncio.Task] = None
+_refresh_pending = False
+_last_refresh_at = 0.0
+
+# Minimum spacing between background refreshes of mv_video_project_performance
+REFRESH_MIN_INTERVAL_SECONDS = 5.0
+
+
+async def _run_refresh() -> None:
+    """Refresh analytics off the event loop, once more if changes arrived meanwhile"""
+    global _refresh_pending, _last_refresh_at
+    while True:
+        # At most one refresh per interval: writes arriving while we wait
+        # are picked up by this refresh instead of triggering another one
+        wait = _last_refresh_at + REFRESH_MIN_INTERVAL_SECONDS - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        _refresh_pending = False
+        await asyncio.to_thread(video_project_service.refresh_analytics)
+        _last_refresh_at = time.monotonic()
+        if not _refresh_pending:
+            break
+
+
+def _schedule_refresh() -> None:
+    """Fire-and-forget refresh so create/update don't wait for the REFRESH"""
+    global _refresh_task, _refresh_pending
+    if _refresh_task is not None and not _refresh_task.done():
+        _refresh_pending = True
+        return
+    _refresh_task = asyncio.create_task(_run_refresh())
+
 
 # Request/Response models
 class VideoProjectCreateRequest(BaseModel):
     """Request model for creating video project"""
+    model_config = ConfigDict(extra="forbid")
+
     title: str
     youtube_url: Optional[str] = None
     description: Optional[str] = None
@@ -19,6 +59,8 @@ class VideoProjectCreateRequest(BaseModel):
 
 class VideoProjectUpdateRequest(BaseModel):
     """Request model for updating video project"""
+    model_config = ConfigDict(extra="forbid")
+
     title: Optional[str] = None
     youtube_url: Optional[str] = None
     thumbnail_url: Optional[str] = None
@@ -61,6 +103,8 @@ class VideoProjectAnalyticsResponse(BaseModel):
 
 class AssignLinkToProjectRequest(BaseModel):
     """Request model for assigning link to project"""
+    model_config = ConfigDict(extra="forbid")
+
     url_id: str
     project_id: str
 
@@ -77,12 +121,26 @@ class VideoPerformanceResponse(BaseModel):
     created_at: str
 
 
+# Same fields the response_models used to filter to
+_project_response = response_fields(VideoProjectResponse)
+_analytics_response = response_fields(VideoProjectAnalyticsResponse)
+_performance_response = response_fields(VideoPerformanceResponse)
+
+
 # Router
 router = APIRouter(prefix="/video-projects", tags=["video-projects"])
 
 
-@router.post("/", response_model=VideoProjectResponse, status_code=status.HTTP_201_CREATED)
-async def create_video_project(project_data: VideoProjectCreateRequest):
+# Services already return well-formed dicts, so endpoints skip response_model
+# revalidation (only filter to the model's keys); the models are kept in
+# `responses` for the OpenAPI docs.
+@router.post(
+    "/",
+    response_model=None,
+    responses={201: {"model": VideoProjectResponse}},
+    status_code=status.HTTP_201_CREATED
+)
+async def create_video_project(project_data: VideoProjectCreateRequest) -> dict:
     """
     Create new video project with optional YouTube metadata
 
@@ -105,18 +163,18 @@ async def create_video_project(project_data: VideoProjectCreateRequest):
         project["total_clicks"] = 0
         project["unique_visitors"] = 0
 
-        # Refresh materialized view to show new project immediately
-        video_project_service.refresh_analytics()
+        # Refresh materialized view in the background
+        _schedule_refresh()
 
-        return project
+        return _project_response(project)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create video project: {str(e)}")
 
 
-@router.get("/")
-async def get_all_video_projects():
+@router.get("/", response_model=None, responses={200: {"model": List[VideoProjectResponse]}})
+async def get_all_video_projects() -> ORJSONResponse:
     """
     Get all video projects with aggregated analytics
 
@@ -128,13 +186,13 @@ async def get_all_video_projects():
     """
     try:
         projects = video_project_service.get_all_video_projects()
-        return projects
+        return ORJSONResponse(content=projects)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve video projects: {str(e)}")
 
 
-@router.get("/{project_id}", response_model=VideoProjectResponse)
-async def get_video_project(project_id: str):
+@router.get("/{project_id}", response_model=None, responses={200: {"model": VideoProjectResponse}})
+async def get_video_project(project_id: str) -> dict:
     """
     Get video project by ID
 
@@ -153,11 +211,11 @@ async def get_video_project(project_id: str):
     project["total_clicks"] = 0
     project["unique_visitors"] = 0
 
-    return project
+    return _project_response(project)
 
 
-@router.patch("/{project_id}", response_model=VideoProjectResponse)
-async def update_video_project(project_id: str, project_data: VideoProjectUpdateRequest):
+@router.patch("/{project_id}", response_model=None, responses={200: {"model": VideoProjectResponse}})
+async def update_video_project(project_id: str, project_data: VideoProjectUpdateRequest) -> dict:
     """
     Update video project
 
@@ -183,10 +241,10 @@ async def update_video_project(project_id: str, project_data: VideoProjectUpdate
         project["total_clicks"] = 0
         project["unique_visitors"] = 0
 
-        # Refresh materialized view to show updated project immediately
-        video_project_service.refresh_analytics()
+        # Refresh materialized view in the background
+        _schedule_refresh()
 
-        return project
+        return _project_response(project)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -203,10 +261,14 @@ async def delete_video_project(project_id: str):
     Args:
         project_id: Project UUID
     """
-    success = video_project_service.delete_video_project(project_id)
+    # Sync Supabase DELETE: run it off the event loop
+    success = await asyncio.to_thread(video_project_service.delete_video_project, project_id)
     if not success:
         raise HTTPException(status_code=404, detail="Video project not found")
 
+    # Refresh materialized view in the background (coalesced with other writes)
+    _schedule_refresh()
+
 
 @router.post("/assign", status_code=status.HTTP_200_OK)
 async def assign_link_to_project(data: AssignLinkToProjectRequest):
@@ -270,8 +332,12 @@ async def get_project_links(project_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to retrieve project links: {str(e)}")
 
 
-@router.get("/{project_id}/analytics", response_model=VideoProjectAnalyticsResponse)
-async def get_project_analytics(project_id: str):
+@router.get(
+    "/{project_id}/analytics",
+    response_model=None,
+    responses={200: {"model": VideoProjectAnalyticsResponse}}
+)
+async def get_project_analytics(project_id: str) -> dict:
     """
     Get aggregated analytics for video project
 
@@ -290,15 +356,19 @@ async def get_project_analytics(project_id: str):
     """
     try:
         analytics = video_project_service.get_project_analytics(project_id)
-        return analytics
+        return _analytics_response(analytics)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve analytics: {str(e)}")
 
 
-@router.get("/performance/comparison", response_model=List[VideoPerformanceResponse])
-async def get_video_performance_comparison(limit: int = 10):
+@router.get(
+    "/performance/comparison",
+    response_model=None,
+    responses={200: {"model": List[VideoPerformanceResponse]}}
+)
+async def get_video_performance_comparison(limit: int = 10) -> ORJSONResponse:
     """
     Get video performance comparison across all projects
 
@@ -312,7 +382,7 @@ async def get_video_performance_comparison(limit: int = 10):
     """
     try:
         performance_data = video_project_service.get_video_performance_comparison(limit=limit)
-        return performance_data
+        return ORJSONResponse(content=[_performance_response(row) for row in performance_data])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve performance data: {str(e)}")
 
@@ -8,17 +8,147 @@ Comprehensive click tracking with advanced analytics:
 - Time pattern analysis
 """
 
+import asyncio
 import hashlib
+import re
+import time
 import uuid
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Dict
+from functools import lru_cache
+from typing import Optional, Dict, List
+from urllib.parse import urlparse
+from cachetools import TTLCache
 from fastapi import Request
 
-from domain.models.url import Click
+from domain.models.url import ClickEvent
 from infrastructure.external_apis.geolocation_client import get_ip_location
 from infrastructure.external_apis.user_agent_parser import parse_user_agent
 from infrastructure.external_apis.video_attribution import parse_video_referrer
 
+# Memory bounds for the in-memory stores (analytics live in the aggregates)
+VISITOR_SESSIONS_MAX = 2_000_000
+VISITOR_SESSION_TTL_SECONDS = 30 * 24 * 3600
+RECENT_CLICKS_PER_URL = 1000
+# Distinct sessions remembered per URL; past it unique_visitors stops growing
+UNIQUE_SESSIONS_PER_URL_MAX = 100_000
+
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Referrer categorization tables (built once at import)
+SOCIAL_PLATFORMS = {
+    'facebook.com': 'facebook',
+    'fb.com': 'facebook',
+    'twitter.com': 'twitter',
+    'x.com': 'twitter',
+    't.co': 'twitter',
+    'linkedin.com': 'linkedin',
+    'instagram.com': 'instagram',
+    'youtube.com': 'youtube',
+    'youtu.be': 'youtube',
+    'tiktok.com': 'tiktok',
+    'reddit.com': 'reddit',
+    'pinterest.com': 'pinterest',
+    'whatsapp.com': 'whatsapp',
+    'telegram.org': 'telegram',
+    'discord.com': 'discord'
+}
+SEARCH_ENGINES_RE = re.compile(r'google|bing|yahoo|duckduckgo|baidu|yandex')
+EMAIL_CLIENTS_RE = re.compile(r'mail\.|outlook|gmail|yahoo\.com|protonmail')
+
+
+@lru_cache(maxsize=4096)
+def parse_referrer(referer: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    """
+    Parse referrer URL to extract domain and type (memoized on the raw
+    referer: a handful of referrers dominate traffic)
+
+    Returns:
+        Tuple of (referrer_domain, referrer_type)
+    """
+    if not referer:
+        return None, 'direct'
+
+    try:
+        parsed = urlparse(referer)
+        domain = parsed.netloc.lower()
+
+        # Categorize referrer type
+        referrer_type = categorize_referrer(domain)
+
+        return domain, referrer_type
+
+    except Exception:
+        return None, 'unknown'
+
+
+@lru_cache(maxsize=1024)
+def categorize_referrer(domain: str) -> str:
+    """
+    Categorize referrer domain into types (memoized per domain)
+    """
+    if not domain:
+        return 'direct'
+
+    # Social media platforms: exact host, then parent domains
+    # (m.facebook.com -> facebook.com), one dict lookup per label
+    host = domain.partition(':')[0]
+    while host:
+        platform_name = SOCIAL_PLATFORMS.get(host)
+        if platform_name:
+            return platform_name
+        host = host.partition('.')[2]
+
+    # Search engines
+    if SEARCH_ENGINES_RE.search(domain):
+        return 'search'
+
+    # Email clients
+    if EMAIL_CLIENTS_RE.search(domain):
+        return 'email'
+
+    # Default to domain or unknown
+    return domain if domain else 'unknown'
+
+
+@dataclass(slots=True)
+class UrlAnalytics:
+    """
+    Running analytics for one URL: slotted counters plus fixed-size
+    hour (0-23) and weekday (0=Monday) histograms indexed by position
+    """
+    total_clicks: int = 0
+    returning_visitors: int = 0
+    sessions: set = field(default_factory=set)  # capped at UNIQUE_SESSIONS_PER_URL_MAX
+    device_breakdown: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    country_breakdown: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    city_breakdown: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    platform_breakdown: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    video_sources: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    referrer_breakdown: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    hour_counts: List[int] = field(default_factory=lambda: [0] * 24)
+    day_counts: List[int] = field(default_factory=lambda: [0] * 7)
+
+
+def _analyze_time_patterns(hour_counts: List[int], day_counts: List[int]) -> dict:
+    """
+    Hour/day distributions and peaks from the fixed-size histograms
+    (argmax over 24 + 7 ints; ties go to the earliest hour/day)
+    """
+    hour_distribution = {hour: count for hour, count in enumerate(hour_counts) if count}
+    day_distribution = {DAY_NAMES[day]: count for day, count in enumerate(day_counts) if count}
+
+    peak_hour = hour_counts.index(max(hour_counts)) if hour_distribution else None
+    peak_day = DAY_NAMES[day_counts.index(max(day_counts))] if day_distribution else None
+
+    return {
+        'hour_distribution': hour_distribution,
+        'day_distribution': day_distribution,
+        'peak_hour': peak_hour,
+        'peak_day': peak_day
+    }
+
 
 class ClickTrackerService:
     """
@@ -27,18 +157,25 @@ class ClickTrackerService:
 
     def __init__(self):
         # In-memory storage for returning visitor detection
-        # Key: (ip_address, url_id) -> first_click_timestamp
-        self.visitor_sessions = {}
+        # Key: (session_id, url_id) -> first_click_timestamp (time.time_ns())
+        # Bounded: visitors not seen for 30 days are forgotten
+        self.visitor_sessions: TTLCache = TTLCache(
+            maxsize=VISITOR_SESSIONS_MAX,
+            ttl=VISITOR_SESSION_TTL_SECONDS
+        )
+
+        # Most recent clicks per url_id (MVP - replace with database later)
+        self.clicks_by_url: Dict[str, deque] = defaultdict(lambda: deque(maxlen=RECENT_CLICKS_PER_URL))
 
-        # In-memory click storage (MVP - replace with database later)
-        self.clicks_storage = []
+        # Running analytics per url_id, updated on every tracked click
+        self.aggregates: Dict[str, UrlAnalytics] = defaultdict(UrlAnalytics)
 
     async def track_click(
         self,
         url_id: str,
         short_code: str,
         request: Request
-    ) -> Click:
+    ) -> ClickEvent:
         """
         Track a click event with comprehensive analytics
 
@@ -48,8 +185,11 @@ class ClickTrackerService:
             request: FastAPI request object
 
         Returns:
-            Click object with all analytics data
+            ClickEvent object with all analytics data
         """
+        # One clock read per click
+        now = datetime.utcnow()
+
         # Extract request metadata
         ip_address = self._extract_ip_address(request)
         user_agent = request.headers.get('user-agent', '')
@@ -58,14 +198,11 @@ class ClickTrackerService:
         # Generate session ID for visitor tracking
         session_id = self._generate_session_id(ip_address, user_agent)
 
-        # Check if returning visitor
-        is_returning = self._check_returning_visitor(ip_address, url_id, session_id)
-
-        # Parse user agent for device/platform info
-        device_info = parse_user_agent(user_agent)
-
-        # Get geolocation (with city-level detail)
-        location_data = await get_ip_location(ip_address)
+        # Check if returning visitor; first visits record the session
+        session_key = (session_id, url_id)
+        is_returning = session_key in self.visitor_sessions
+        if not is_returning:
+            self.visitor_sessions[session_key] = time.time_ns()
 
         # Parse video attribution from referrer
         video_data = parse_video_referrer(referer)
@@ -73,8 +210,17 @@ class ClickTrackerService:
         # Extract referrer domain and type
         referrer_domain, referrer_type = self._parse_referrer(referer)
 
+        # Geolocation (network, city-level detail) and user agent parsing
+        # (CPU, worker thread) run concurrently: latency is max(), not sum().
+        # Started after the inline parsing above (which would only run before
+        # the first await anyway), so an exception there can't orphan the tasks
+        location_data, device_info = await asyncio.gather(
+            get_ip_location(ip_address),
+            asyncio.to_thread(parse_user_agent, user_agent),
+        )
+
         # Create click record
-        click = Click(
+        click = ClickEvent(
             id=f"click_{uuid.uuid4().hex[:12]}",
             url_id=url_id,
             short_code=short_code,
@@ -101,14 +247,12 @@ class ClickTrackerService:
             is_returning_visitor=is_returning,
             session_id=session_id,
             # Timestamp
-            clicked_at=datetime.utcnow()
+            clicked_at=now
         )
 
         # Store click (in-memory for MVP)
-        self.clicks_storage.append(click)
-
-        # Update visitor session tracking
-        self._record_visitor_session(ip_address, url_id, session_id)
+        self.clicks_by_url[url_id].append(click)
+        self._update_aggregate(self.aggregates[url_id], click)
 
         return click
 
@@ -120,7 +264,7 @@ class ClickTrackerService:
         forwarded_for = request.headers.get('x-forwarded-for')
         if forwarded_for:
             # Take the first IP in the chain
-            return forwarded_for.split(',')[0].strip()
+            return forwarded_for.partition(',')[0].strip()
 
         real_ip = request.headers.get('x-real-ip')
         if real_ip:
@@ -138,32 +282,8 @@ class ClickTrackerService:
         Uses IP + user agent hash for privacy-friendly tracking
         """
         session_string = f"{ip_address}:{user_agent}"
-        return hashlib.sha256(session_string.encode()).hexdigest()[:16]
-
-    def _check_returning_visitor(
-        self,
-        ip_address: str,
-        url_id: str,
-        session_id: str
-    ) -> bool:
-        """
-        Check if this visitor has clicked this link before
-        """
-        visitor_key = f"{session_id}:{url_id}"
-        return visitor_key in self.visitor_sessions
-
-    def _record_visitor_session(
-        self,
-        ip_address: str,
-        url_id: str,
-        session_id: str
-    ):
-        """
-        Record visitor session for returning visitor detection
-        """
-        visitor_key = f"{session_id}:{url_id}"
-        if visitor_key not in self.visitor_sessions:
-            self.visitor_sessions[visitor_key] = datetime.utcnow()
+        # blake2b sized to the 16 hex chars we keep (no truncated sha256)
+        return hashlib.blake2b(session_string.encode('utf-8', 'replace'), digest_size=8).hexdigest()
 
     def _parse_referrer(self, referer: Optional[str]) -> tuple[Optional[str], Optional[str]]:
         """
@@ -172,76 +292,25 @@ class ClickTrackerService:
         Returns:
             Tuple of (referrer_domain, referrer_type)
         """
-        if not referer:
-            return None, 'direct'
-
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(referer)
-            domain = parsed.netloc.lower()
-
-            # Categorize referrer type
-            referrer_type = self._categorize_referrer(domain)
-
-            return domain, referrer_type
-
-        except Exception:
-            return None, 'unknown'
+        return parse_referrer(referer)
 
     def _categorize_referrer(self, domain: str) -> str:
         """
         Categorize referrer domain into types
         """
-        if not domain:
-            return 'direct'
-
-        # Social media platforms
-        social_platforms = {
-            'facebook.com': 'facebook',
-            'fb.com': 'facebook',
-            'twitter.com': 'twitter',
-            'x.com': 'twitter',
-            't.co': 'twitter',
-            'linkedin.com': 'linkedin',
-            'instagram.com': 'instagram',
-            'youtube.com': 'youtube',
-            'youtu.be': 'youtube',
-            'tiktok.com': 'tiktok',
-            'reddit.com': 'reddit',
-            'pinterest.com': 'pinterest',
-            'whatsapp.com': 'whatsapp',
-            'telegram.org': 'telegram',
-            'discord.com': 'discord'
-        }
-
-        for platform_domain, platform_name in social_platforms.items():
-            if platform_domain in domain:
-                return platform_name
-
-        # Search engines
-        search_engines = ['google', 'bing', 'yahoo', 'duckduckgo', 'baidu', 'yandex']
-        if any(engine in domain for engine in search_engines):
-            return 'search'
-
-        # Email clients
-        email_clients = ['mail.', 'outlook', 'gmail', 'yahoo.com', 'protonmail']
-        if any(client in domain for client in email_clients):
-            return 'email'
-
-        # Default to domain or unknown
-        return domain if domain else 'unknown'
+        return categorize_referrer(domain)
 
-    def get_clicks_by_url(self, url_id: str) -> list[Click]:
+    def get_clicks_by_url(self, url_id: str) -> list[ClickEvent]:
         """
-        Get all clicks for a specific URL
+        Get the most recent clicks (up to RECENT_CLICKS_PER_URL) for a URL
 
         Args:
             url_id: URL identifier
 
         Returns:
-            List of Click objects
+            List of ClickEvent objects
         """
-        return [click for click in self.clicks_storage if click.url_id == url_id]
+        return list(self.clicks_by_url.get(url_id, ()))
 
     def get_analytics_summary(self, url_id: str) -> dict:
         """
@@ -253,9 +322,9 @@ class ClickTrackerService:
         Returns:
             Analytics summary dictionary
         """
-        clicks = self.get_clicks_by_url(url_id)
+        agg = self.aggregates.get(url_id)
 
-        if not clicks:
+        if not agg:
             return {
                 'total_clicks': 0,
                 'unique_visitors': 0,
@@ -269,97 +338,48 @@ class ClickTrackerService:
                 'referrer_breakdown': {}
             }
 
-        # Calculate metrics
-        total_clicks = len(clicks)
-        unique_sessions = len(set(click.session_id for click in clicks if click.session_id))
-        returning_count = sum(1 for click in clicks if click.is_returning_visitor)
-
-        # Device breakdown
-        device_breakdown = {}
-        for click in clicks:
-            device = click.device_type or 'unknown'
-            device_breakdown[device] = device_breakdown.get(device, 0) + 1
-
-        # Country breakdown
-        country_breakdown = {}
-        for click in clicks:
-            country = click.country_name or 'Unknown'
-            country_breakdown[country] = country_breakdown.get(country, 0) + 1
-
-        # City breakdown (NEW)
-        city_breakdown = {}
-        for click in clicks:
-            if click.city:
-                city_key = f"{click.city}, {click.country_code or 'XX'}"
-                city_breakdown[city_key] = city_breakdown.get(city_key, 0) + 1
-
-        # Platform breakdown (NEW - detailed OS versions)
-        platform_breakdown = {}
-        for click in clicks:
-            platform = click.platform or 'Unknown'
-            platform_breakdown[platform] = platform_breakdown.get(platform, 0) + 1
-
-        # Video sources (NEW)
-        video_sources = {}
-        for click in clicks:
-            if click.video_platform and click.video_id:
-                video_key = f"{click.video_platform}:{click.video_id}"
-                video_sources[video_key] = video_sources.get(video_key, 0) + 1
-
-        # Time patterns (NEW - hour/day analysis)
-        time_patterns = self._analyze_time_patterns(clicks)
-
-        # Referrer breakdown
-        referrer_breakdown = {}
-        for click in clicks:
-            ref_type = click.referrer_type or 'direct'
-            referrer_breakdown[ref_type] = referrer_breakdown.get(ref_type, 0) + 1
-
         return {
-            'total_clicks': total_clicks,
-            'unique_visitors': unique_sessions,
-            'returning_visitors': returning_count,
-            'device_breakdown': device_breakdown,
-            'country_breakdown': country_breakdown,
-            'city_breakdown': city_breakdown,  # NEW
-            'platform_breakdown': platform_breakdown,  # NEW
-            'video_sources': video_sources,  # NEW
-            'time_patterns': time_patterns,  # NEW
-            'referrer_breakdown': referrer_breakdown
+            'total_clicks': agg.total_clicks,
+            'unique_visitors': len(agg.sessions),
+            'returning_visitors': agg.returning_visitors,
+            'device_breakdown': dict(agg.device_breakdown),
+            'country_breakdown': dict(agg.country_breakdown),
+            'city_breakdown': dict(agg.city_breakdown),  # NEW
+            'platform_breakdown': dict(agg.platform_breakdown),  # NEW
+            'video_sources': dict(agg.video_sources),  # NEW
+            'time_patterns': _analyze_time_patterns(agg.hour_counts, agg.day_counts),  # NEW
+            'referrer_breakdown': dict(agg.referrer_breakdown)
         }
 
-    def _analyze_time_patterns(self, clicks: list[Click]) -> dict:
+    def _update_aggregate(self, agg: UrlAnalytics, click: ClickEvent) -> None:
         """
-        Analyze click patterns by time (hour of day, day of week)
-
-        Returns:
-            Dictionary with time pattern analytics
+        Add one click to a URL's running analytics (O(1) per click)
         """
-        hour_distribution = {}
-        day_distribution = {}
+        agg.total_clicks += 1
+        if click.session_id and len(agg.sessions) < UNIQUE_SESSIONS_PER_URL_MAX:
+            agg.sessions.add(click.session_id)
+        if click.is_returning_visitor:
+            agg.returning_visitors += 1
 
-        for click in clicks:
-            if click.clicked_at:
-                # Hour of day (0-23)
-                hour = click.clicked_at.hour
-                hour_distribution[hour] = hour_distribution.get(hour, 0) + 1
+        agg.device_breakdown[click.device_type or 'unknown'] += 1
+        agg.country_breakdown[click.country_name or 'Unknown'] += 1
 
-                # Day of week (0=Monday, 6=Sunday)
-                day = click.clicked_at.weekday()
-                day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                day_name = day_names[day]
-                day_distribution[day_name] = day_distribution.get(day_name, 0) + 1
+        if click.city:
+            agg.city_breakdown[f"{click.city}, {click.country_code or 'XX'}"] += 1
 
-        # Find peak hour and day
-        peak_hour = max(hour_distribution.items(), key=lambda x: x[1])[0] if hour_distribution else None
-        peak_day = max(day_distribution.items(), key=lambda x: x[1])[0] if day_distribution else None
+        # Detailed OS versions
+        agg.platform_breakdown[click.platform or 'Unknown'] += 1
 
-        return {
-            'hour_distribution': hour_distribution,
-            'day_distribution': day_distribution,
-            'peak_hour': peak_hour,
-            'peak_day': peak_day
-        }
+        if click.video_platform and click.video_id:
+            agg.video_sources[f"{click.video_platform}:{click.video_id}"] += 1
+
+        agg.referrer_breakdown[click.referrer_type or 'direct'] += 1
+
+        clicked_at = click.clicked_at
+        if clicked_at:
+            # Hour of day (0-23) and day of week (0=Monday, 6=Sunday)
+            agg.hour_counts[clicked_at.hour] += 1
+            agg.day_counts[clicked_at.weekday()] += 1
 
 
 # Singleton instance
@@ -2,10 +2,36 @@
 Folder Service - Business logic para organización de URLs
 """
 import secrets
-from typing import List, Optional, Dict
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Dict, Set
 from datetime import datetime
 
 
+@dataclass(slots=True)
+class FolderRow:
+    """Folder almacenado en memoria (slots: sin dict por instancia)"""
+    id: str
+    name: str
+    color: str
+    icon: str
+    parent_folder_id: Optional[str]
+    created_at: str
+    updated_at: str
+
+    def to_dict(self) -> dict:
+        """Response dict (nueva copia, el caller puede mutarla)"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "color": self.color,
+            "icon": self.icon,
+            "parent_folder_id": self.parent_folder_id,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
 class FolderService:
     """Service para gestionar folders y organización de links"""
 
@@ -16,8 +42,10 @@ class FolderService:
             self.use_db = True
         else:
             # Fallback to in-memory storage for testing
-            self.folders: Dict[str, dict] = {}
-            self.folder_links: Dict[str, List[str]] = {}
+            self.folders: Dict[str, FolderRow] = {}
+            self.folder_links: Dict[str, Set[str]] = {}
+            # parent_folder_id (None = root) -> direct subfolder ids (kept incrementally)
+            self.children: Dict[Optional[str], List[str]] = defaultdict(list)
             self.use_db = False
             self.repo = None
 
@@ -53,27 +81,30 @@ class FolderService:
                 raise ValueError(f"Parent folder {parent_folder_id} not found")
 
             folder_id = self.generate_folder_id()
-            folder = {
-                "id": folder_id,
-                "name": name,
-                "color": color,
-                "icon": icon,
-                "parent_folder_id": parent_folder_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat(),
-            }
+            now = datetime.utcnow().isoformat()
+            folder = FolderRow(
+                id=folder_id,
+                name=name,
+                color=color,
+                icon=icon,
+                parent_folder_id=parent_folder_id,
+                created_at=now,
+                updated_at=now,
+            )
 
             self.folders[folder_id] = folder
-            self.folder_links[folder_id] = []
+            self.folder_links[folder_id] = set()
+            self.children[parent_folder_id].append(folder_id)
 
-            return folder
+            return folder.to_dict()
 
     def get_folder(self, folder_id: str) -> Optional[dict]:
         """Get folder by ID"""
         if self.use_db:
             return self.repo.get(folder_id)
         else:
-            return self.folders.get(folder_id)
+            folder = self.folders.get(folder_id)
+            return folder.to_dict() if folder else None
 
     def get_all_folders(self) -> List[dict]:
         """Get all folders with analytics"""
@@ -84,12 +115,9 @@ class FolderService:
             # In-memory fallback
             result = []
             for folder_id, folder in self.folders.items():
-                folder_data = folder.copy()
-                folder_data["link_count"] = len(self.folder_links.get(folder_id, []))
-                folder_data["subfolder_count"] = sum(
-                    1 for f in self.folders.values()
-                    if f.get("parent_folder_id") == folder_id
-                )
+                folder_data = folder.to_dict()
+                folder_data["link_count"] = len(self.folder_links.get(folder_id, ()))
+                folder_data["subfolder_count"] = len(self.children.get(folder_id, ()))
                 result.append(folder_data)
             return result
 
@@ -113,18 +141,22 @@ class FolderService:
             folder = self.folders[folder_id]
 
             if name is not None:
-                folder["name"] = name
+                folder.name = name
             if color is not None:
-                folder["color"] = color
+                folder.color = color
             if icon is not None:
-                folder["icon"] = icon
+                folder.icon = icon
             if parent_folder_id is not None:
                 # Validate parent exists and no circular reference
                 if parent_folder_id != folder_id and parent_folder_id in self.folders:
-                    folder["parent_folder_id"] = parent_folder_id
+                    old_parent_id = folder.parent_folder_id
+                    if old_parent_id != parent_folder_id:
+                        self.children[old_parent_id].remove(folder_id)
+                        self.children[parent_folder_id].append(folder_id)
+                    folder.parent_folder_id = parent_folder_id
 
-            folder["updated_at"] = datetime.utcnow().isoformat()
-            return folder
+            folder.updated_at = datetime.utcnow().isoformat()
+            return folder.to_dict()
 
     def delete_folder(self, folder_id: str, delete_links: bool = False) -> bool:
         """
@@ -146,10 +178,15 @@ class FolderService:
                 return False
 
             # Handle subfolders - move to parent or orphan
-            parent_id = self.folders[folder_id].get("parent_folder_id")
-            for folder in self.folders.values():
-                if folder.get("parent_folder_id") == folder_id:
-                    folder["parent_folder_id"] = parent_id
+            parent_id = self.folders[folder_id].parent_folder_id
+            moved_children = self.children.pop(folder_id, [])
+            for child_id in moved_children:
+                self.folders[child_id].parent_folder_id = parent_id
+
+            # Parent loses the deleted folder but adopts its subfolders
+            siblings = self.children[parent_id]
+            siblings.remove(folder_id)
+            siblings.extend(moved_children)
 
             # Handle links
             if delete_links:
@@ -157,7 +194,7 @@ class FolderService:
             else:
                 # Move links to parent folder
                 if parent_id and parent_id in self.folder_links:
-                    self.folder_links[parent_id].extend(self.folder_links.get(folder_id, []))
+                    self.folder_links[parent_id].update(self.folder_links.get(folder_id, ()))
                 del self.folder_links[folder_id]
 
             del self.folders[folder_id]
@@ -182,11 +219,7 @@ class FolderService:
             if folder_id not in self.folders:
                 raise ValueError(f"Folder {folder_id} not found")
 
-            if folder_id not in self.folder_links:
-                self.folder_links[folder_id] = []
-
-            if url_id not in self.folder_links[folder_id]:
-                self.folder_links[folder_id].append(url_id)
+            self.folder_links.setdefault(folder_id, set()).add(url_id)
 
             return True
 
@@ -200,12 +233,22 @@ class FolderService:
             if folder_id not in self.folder_links:
                 return False
 
-            if url_id in self.folder_links[folder_id]:
-                self.folder_links[folder_id].remove(url_id)
+            links = self.folder_links[folder_id]
+            if url_id in links:
+                links.discard(url_id)
                 return True
 
             return False
 
+    def get_subfolder_count(self, folder_id: str) -> int:
+        """Get number of direct subfolders"""
+        if self.use_db:
+            # Use Supabase repository
+            return self.repo.count_subfolders(folder_id)
+        else:
+            # In-memory fallback
+            return len(self.children.get(folder_id, ()))
+
     def get_folder_links(self, folder_id: str) -> List[str]:
         """Get all URL IDs in folder"""
         if self.use_db:
@@ -213,7 +256,7 @@ class FolderService:
             return self.repo.get_links(folder_id)
         else:
             # In-memory fallback
-            return self.folder_links.get(folder_id, [])
+            return list(self.folder_links.get(folder_id, ()))
 
     def get_folder_tree(self) -> List[dict]:
         """
@@ -229,24 +272,22 @@ class FolderService:
             # In-memory fallback
             def build_tree(parent_id: Optional[str] = None) -> List[dict]:
                 result = []
-                for folder_id, folder in self.folders.items():
-                    if folder.get("parent_folder_id") == parent_id:
-                        folder_data = folder.copy()
-                        folder_data["link_count"] = len(self.folder_links.get(folder_id, []))
-                        folder_data["subfolders"] = build_tree(folder_id)
-                        result.append(folder_data)
+                for folder_id in self.children.get(parent_id, ()):
+                    folder_data = self.folders[folder_id].to_dict()
+                    folder_data["link_count"] = len(self.folder_links.get(folder_id, ()))
+                    folder_data["subfolders"] = build_tree(folder_id)
+                    result.append(folder_data)
                 return sorted(result, key=lambda x: x["name"])
 
             return build_tree(None)
 
-    def get_folder_analytics(self, folder_id: str, urls_data: dict, clicks_data: List[dict]) -> dict:
+    def get_folder_analytics(self, folder_id: str, clicks_data: Iterable[dict] = ()) -> dict:
         """
         Get aggregated analytics for folder
 
         Args:
             folder_id: Folder to analyze
-            urls_data: Dict of URL data {url_id: url_obj}
-            clicks_data: List of click dicts
+            clicks_data: Click dicts to aggregate (in-memory mode keeps no clicks itself)
 
         Returns:
             Analytics summary
@@ -260,31 +301,27 @@ class FolderService:
             raise ValueError(f"Folder {folder_id} not found")
 
         folder = self.folders[folder_id]
-        link_ids = self.folder_links.get(folder_id, [])
+        link_ids = self.folder_links.get(folder_id, ())
 
-        # Aggregate metrics
+        # Aggregate metrics in one pass (set membership: O(clicks), not O(clicks * links))
         total_clicks = 0
         unique_visitors = set()
-        device_breakdown = {}
-        country_breakdown = {}
+        device_breakdown = defaultdict(int)
+        country_breakdown = defaultdict(int)
 
         for click in clicks_data:
             if click.get("url_id") in link_ids:
                 total_clicks += 1
                 unique_visitors.add(click.get("ip_address"))
-
-                device = click.get("device_type", "unknown")
-                device_breakdown[device] = device_breakdown.get(device, 0) + 1
-
-                country = click.get("country_name", "Unknown")
-                country_breakdown[country] = country_breakdown.get(country, 0) + 1
+                device_breakdown[click.get("device_type", "unknown")] += 1
+                country_breakdown[click.get("country_name", "Unknown")] += 1
 
         return {
             "folder_id": folder_id,
-            "folder_name": folder["name"],
+            "folder_name": folder.name,
             "link_count": len(link_ids),
             "total_clicks": total_clicks,
             "unique_visitors": len(unique_visitors),
-            "device_breakdown": device_breakdown,
-            "country_breakdown": country_breakdown,
-        }
\ No newline at end of file
+            "device_breakdown": dict(device_breakdown),
+            "country_breakdown": dict(country_breakdown),
+        }
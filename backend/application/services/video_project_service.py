@@ -2,7 +2,11 @@
 Video Project Service - Business logic for video-centric project organization
 Integrates YouTube metadata and aggregated analytics
 """
+import asyncio
+import heapq
+import logging
 import secrets
+from operator import itemgetter
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from infrastructure.persistence.supabase_client import get_supabase
@@ -17,6 +21,13 @@ from domain.models.video_project import (
     VideoProjectPerformance
 )
 
+logger = logging.getLogger(__name__)
+
+
+def _first(response) -> Optional[dict]:
+    """First row of a Supabase response, or None if it returned no rows"""
+    return response.data[0] if response.data else None
+
 
 class VideoProjectService:
     """Service for managing video-centric projects with YouTube integration"""
@@ -31,6 +42,12 @@ class VideoProjectService:
         self.use_supabase = use_supabase
         if use_supabase:
             self.supabase = get_supabase()
+            # Table builders created once (each select/insert/... returns a new request)
+            self.projects_table = self.supabase.table('video_projects')
+            self.links_table = self.supabase.table('project_links')
+            self.links_flat_view = self.supabase.table('v_project_links_flat')
+            self.performance_view = self.supabase.table('mv_video_project_performance')
+            self.analytics_view = self.supabase.table('v_project_analytics')
         else:
             # In-memory fallback for testing
             self.projects: Dict[str, dict] = {}
@@ -55,7 +72,8 @@ class VideoProjectService:
             description: Project description (optional)
 
         Returns:
-            Created project dict with YouTube metadata
+            Created project dict with YouTube metadata (the inserted row as
+            returned by the INSERT itself, no follow-up SELECT)
         """
         # Initialize project data
         project_data = {
@@ -69,12 +87,9 @@ class VideoProjectService:
         # If YouTube URL provided, fetch metadata
         if youtube_url:
             try:
-                # Extract video ID
-                video_id = extract_youtube_video_id(youtube_url)
-                project_data["youtube_video_id"] = video_id
-
-                # Fetch metadata (includes thumbnail)
+                # Fetch metadata (includes video ID and thumbnail, one extraction)
                 metadata = await get_youtube_metadata(youtube_url)
+                project_data["youtube_video_id"] = metadata.get("video_id")
 
                 if metadata.get("thumbnail_url"):
                     project_data["thumbnail_url"] = metadata["thumbnail_url"]
@@ -87,37 +102,42 @@ class VideoProjectService:
                     project_data["description"] = metadata["description"]
 
             except Exception as e:
-                print(f"⚠️ YouTube metadata fetch failed: {e}")
+                logger.warning("⚠️ YouTube metadata fetch failed: %s", e)
                 # Continue with user-provided title
+                project_data["youtube_video_id"] = extract_youtube_video_id(youtube_url)
+
+        # One timestamp for both columns: created_at == updated_at on creation
+        now_iso = datetime.utcnow().isoformat()
 
         if self.use_supabase:
-            # Create in Supabase
-            response = self.supabase.table('video_projects').insert({
+            # Create in Supabase (sync client: run the round trip off the event loop)
+            query = self.projects_table.insert({
                 "title": project_data["title"],
                 "youtube_url": project_data["youtube_url"],
                 "youtube_video_id": project_data["youtube_video_id"],
                 "thumbnail_url": project_data["thumbnail_url"],
                 "description": project_data["description"],
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
-            }).execute()
+                "created_at": now_iso,
+                "updated_at": now_iso
+            })
+            row = _first(await asyncio.to_thread(query.execute))
 
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            else:
+            if row is None:
                 raise ValueError("Failed to create video project")
+            return row
         else:
             # In-memory fallback
             project_id = self.generate_project_id()
             project = {
                 "id": project_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat(),
+                "created_at": now_iso,
+                "updated_at": now_iso,
                 **project_data
             }
             self.projects[project_id] = project
             self.project_links[project_id] = []
-            return project
+            # Copy, like a RETURNING row: callers add response fields to it
+            return project.copy()
 
     def get_video_project(self, project_id: str) -> Optional[dict]:
         """
@@ -130,11 +150,8 @@ class VideoProjectService:
             Project dict or None if not found
         """
         if self.use_supabase:
-            response = self.supabase.table('video_projects').select('*').eq('id', project_id).execute()
-
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            return None
+            response = self.projects_table.select('*').eq('id', project_id).execute()
+            return _first(response)
         else:
             # In-memory fallback
             return self.projects.get(project_id)
@@ -148,7 +165,7 @@ class VideoProjectService:
         """
         if self.use_supabase:
             # Query materialized view for analytics
-            response = self.supabase.table('mv_video_project_performance').select('*').execute()
+            response = self.performance_view.select('*').execute()
 
             if response.data:
                 # Transform materialized view data to API response format
@@ -197,7 +214,7 @@ class VideoProjectService:
             description: New description (optional)
 
         Returns:
-            Updated project dict
+            Updated project dict (the row returned by the UPDATE itself)
         """
         update_data = {
             "updated_at": datetime.utcnow().isoformat()
@@ -214,34 +231,33 @@ class VideoProjectService:
         if youtube_url is not None:
             update_data["youtube_url"] = youtube_url
 
-            # Extract video ID
-            video_id = extract_youtube_video_id(youtube_url)
-            update_data["youtube_video_id"] = video_id
-
-            # Fetch metadata
+            # Fetch metadata (includes video ID, one extraction)
             try:
                 metadata = await get_youtube_metadata(youtube_url)
+                update_data["youtube_video_id"] = metadata.get("video_id")
                 if metadata.get("thumbnail_url"):
                     update_data["thumbnail_url"] = metadata["thumbnail_url"]
                 if metadata.get("title") and title is None:
                     update_data["title"] = metadata["title"]
             except Exception as e:
-                print(f"⚠️ YouTube metadata fetch failed during update: {e}")
+                logger.warning("⚠️ YouTube metadata fetch failed during update: %s", e)
+                update_data["youtube_video_id"] = extract_youtube_video_id(youtube_url)
 
         if self.use_supabase:
-            response = self.supabase.table('video_projects').update(update_data).eq('id', project_id).execute()
+            # Sync client: run the round trip off the event loop
+            query = self.projects_table.update(update_data).eq('id', project_id)
+            row = _first(await asyncio.to_thread(query.execute))
 
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            else:
+            if row is None:
                 raise ValueError(f"Project {project_id} not found")
+            return row
         else:
             # In-memory fallback
             if project_id not in self.projects:
                 raise ValueError(f"Project {project_id} not found")
 
             self.projects[project_id].update(update_data)
-            return self.projects[project_id]
+            return self.projects[project_id].copy()
 
     def delete_video_project(self, project_id: str) -> bool:
         """
@@ -254,34 +270,30 @@ class VideoProjectService:
             True if deleted successfully
 
         Note:
-            CASCADE will automatically delete project_links entries
+            CASCADE will automatically delete project_links entries.
+            Does not refresh mv_video_project_performance; call
+            refresh_analytics() (the API schedules it in the background).
         """
         if self.use_supabase:
             try:
-                print(f"🗑️ [DELETE] Attempting to delete project: {project_id}")
+                logger.debug("🗑️ [DELETE] Attempting to delete project: %s", project_id)
 
                 # Delete the project directly (CASCADE will delete project_links)
                 # No existence check needed - if project doesn't exist, Supabase returns empty data
-                delete_response = self.supabase.table('video_projects').delete().eq('id', project_id).execute()
-                print(f"🔍 [DELETE] Delete response - Data: {delete_response.data}")
+                delete_response = self.projects_table.delete().eq('id', project_id).execute()
+                logger.debug("🔍 [DELETE] Delete response - Data: %s", delete_response.data)
 
                 # Check if deletion affected any rows
-                if not delete_response.data or len(delete_response.data) == 0:
-                    print(f"❌ [DELETE] Project NOT found or already deleted: {project_id}")
+                if not delete_response.data:
+                    logger.info("❌ [DELETE] Project NOT found or already deleted: %s", project_id)
                     return False
 
-                print(f"✅ [DELETE] Project deleted successfully: {project_id}")
-
-                # Refresh materialized view to update analytics
-                print(f"🔄 [DELETE] Refreshing materialized view...")
-                self.supabase.rpc('refresh_video_project_analytics').execute()
-                print(f"✅ [DELETE] Materialized view refreshed")
+                logger.info("✅ [DELETE] Project deleted successfully: %s", project_id)
 
+                # Materialized view refresh is left to the caller (see refresh_analytics)
                 return True
             except Exception as e:
-                print(f"❌ [DELETE] Error deleting project: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("❌ [DELETE] Error deleting project: %s", e)
                 return False
         else:
             # In-memory fallback
@@ -305,23 +317,17 @@ class VideoProjectService:
         """
         if self.use_supabase:
             try:
-                # Check if already assigned
-                existing = self.supabase.table('project_links').select('*').eq('project_id', project_id).eq('url_id', url_id).execute()
-
-                if existing.data and len(existing.data) > 0:
-                    # Already assigned
-                    return True
-
-                # Create assignment
-                response = self.supabase.table('project_links').insert({
+                # Single round trip: UNIQUE(project_id, url_id) makes an existing
+                # assignment a no-op (ON CONFLICT DO NOTHING), errors raise
+                self.links_table.upsert({
                     "project_id": project_id,
                     "url_id": url_id,
                     "added_at": datetime.utcnow().isoformat()
-                }).execute()
+                }, on_conflict="project_id,url_id", ignore_duplicates=True).execute()
 
-                return response.data is not None and len(response.data) > 0
+                return True
             except Exception as e:
-                print(f"❌ Error assigning link to project: {e}")
+                logger.error("❌ Error assigning link to project: %s", e)
                 return False
         else:
             # In-memory fallback
@@ -348,8 +354,8 @@ class VideoProjectService:
             True if removed successfully
         """
         if self.use_supabase:
-            response = self.supabase.table('project_links').delete().eq('project_id', project_id).eq('url_id', url_id).execute()
-            return response.data is not None and len(response.data) > 0
+            response = self.links_table.delete().eq('project_id', project_id).eq('url_id', url_id).execute()
+            return bool(response.data)
         else:
             # In-memory fallback
             if project_id not in self.project_links:
@@ -370,21 +376,12 @@ class VideoProjectService:
             List of URL dicts with click counts
         """
         if self.use_supabase:
-            # Join project_links with urls table
-            response = self.supabase.table('project_links').select(
-                'url_id, added_at, urls(id, short_code, original_url, title, click_count, created_at)'
+            # Join done server-side by the v_project_links_flat view (already flat rows)
+            response = self.links_flat_view.select(
+                'id, short_code, original_url, title, click_count, created_at, added_at'
             ).eq('project_id', project_id).execute()
 
-            if response.data:
-                # Flatten the nested structure
-                links = []
-                for row in response.data:
-                    if row.get('urls'):
-                        link_data = row['urls']
-                        link_data['added_at'] = row['added_at']
-                        links.append(link_data)
-                return links
-            return []
+            return response.data or []
         else:
             # In-memory fallback
             return self.project_links.get(project_id, [])
@@ -400,44 +397,11 @@ class VideoProjectService:
             Analytics dict with aggregated metrics across all links
         """
         if self.use_supabase:
-            # Query materialized view for project analytics
-            response = self.supabase.table('mv_video_project_performance').select('*').eq('project_id', project_id).execute()
-
-            if response.data and len(response.data) > 0:
-                row = response.data[0]
-                return {
-                    "project_id": row["project_id"],
-                    "title": row["title"],
-                    "youtube_url": row["youtube_url"],
-                    "youtube_video_id": row["youtube_video_id"],
-                    "thumbnail_url": row["thumbnail_url"],
-                    "created_at": row["created_at"],
-                    "total_links": row["total_links"],
-                    "total_clicks": row["total_clicks"],
-                    "unique_visitors": row["unique_visitors"],
-                    "countries_reached": row["countries_reached"],
-                    "mobile_clicks": row["mobile_clicks"],
-                    "desktop_clicks": row["desktop_clicks"],
-                    "tablet_clicks": row["tablet_clicks"],
-                    "last_click_at": row["last_click_at"],
-                    "first_click_at": row["first_click_at"]
-                }
-
-            # If no analytics yet, return project with zero stats
-            project = self.get_video_project(project_id)
-            if project:
-                return {
-                    **project,
-                    "total_links": 0,
-                    "total_clicks": 0,
-                    "unique_visitors": 0,
-                    "countries_reached": 0,
-                    "mobile_clicks": 0,
-                    "desktop_clicks": 0,
-                    "tablet_clicks": 0,
-                    "last_click_at": None,
-                    "first_click_at": None
-                }
+            # One query: v_project_analytics already has zero stats for
+            # projects that are not in the materialized view yet
+            analytics = self.get_project_analytics_bulk([project_id]).get(project_id)
+            if analytics:
+                return analytics
 
             raise ValueError(f"Project {project_id} not found")
         else:
@@ -452,6 +416,35 @@ class VideoProjectService:
                 "unique_visitors": 0
             }
 
+    def get_project_analytics_bulk(self, project_ids: List[str]) -> Dict[str, dict]:
+        """
+        Get analytics for many projects in one query (instead of one per project)
+
+        Args:
+            project_ids: Project UUIDs
+
+        Returns:
+            Dict project_id -> analytics dict; unknown project ids are omitted
+        """
+        if not project_ids:
+            return {}
+
+        if self.use_supabase:
+            response = self.analytics_view.select('*').in_('project_id', project_ids).execute()
+
+            # View columns are exactly the analytics fields
+            return {
+                row["project_id"]: row
+                for row in response.data or []
+            }
+        else:
+            # In-memory fallback
+            return {
+                project_id: self.get_project_analytics(project_id)
+                for project_id in project_ids
+                if project_id in self.projects
+            }
+
     def get_video_performance_comparison(self, limit: int = 10) -> List[dict]:
         """
         Get performance comparison across all videos
@@ -463,17 +456,16 @@ class VideoProjectService:
             List of projects sorted by total_clicks descending
         """
         if self.use_supabase:
-            response = self.supabase.table('mv_video_project_performance').select(
+            response = self.performance_view.select(
                 'project_id, title, youtube_url, thumbnail_url, total_clicks, unique_visitors, total_links, created_at'
             ).order('total_clicks', desc=True).limit(limit).execute()
 
-            return response.data if response.data else []
+            return response.data or []
         else:
-            # In-memory fallback
+            # In-memory fallback: top-limit selection, O(N log limit) instead of a full sort
+            # (same result and tie order as sorted(..., reverse=True)[:limit])
             projects = self.get_all_video_projects()
-            # Sort by total_clicks descending
-            sorted_projects = sorted(projects, key=lambda x: x.get('total_clicks', 0), reverse=True)
-            return sorted_projects[:limit]
+            return heapq.nlargest(limit, projects, key=itemgetter('total_clicks'))
 
     def refresh_analytics(self) -> bool:
         """
@@ -486,10 +478,10 @@ class VideoProjectService:
             try:
                 # Call Postgres RPC function to refresh materialized view
                 self.supabase.rpc('refresh_video_project_analytics').execute()
-                print("✅ Video project analytics refreshed")
+                logger.info("✅ Video project analytics refreshed")
                 return True
             except Exception as e:
-                print(f"❌ Failed to refresh analytics: {e}")
+                logger.error("❌ Failed to refresh analytics: %s", e)
                 return False
         else:
             # In-memory mode doesn't need refresh
@@ -3,7 +3,9 @@ Safely apply Supabase migration using Python
 """
 
 import os
+import re
 import sys
+from collections import Counter
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
@@ -13,6 +15,9 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
+# Statement kinds reported in the migration summary
+STATEMENT_RE = re.compile(r"ALTER TABLE|CREATE INDEX|CREATE MATERIALIZED VIEW")
+
 def read_migration():
     """Read migration SQL file"""
     migration_path = "../supabase/migrations/002_youtube_analytics_enhancement.sql"
@@ -34,10 +39,11 @@ def apply_migration_via_rpc():
 
     migration_sql = read_migration()
 
-    # Count operations
-    alter_count = migration_sql.count("ALTER TABLE")
-    index_count = migration_sql.count("CREATE INDEX")
-    view_count = migration_sql.count("CREATE MATERIALIZED VIEW")
+    # Count operations (single scan for all three statement kinds)
+    counts = Counter(m.group() for m in STATEMENT_RE.finditer(migration_sql))
+    alter_count = counts["ALTER TABLE"]
+    index_count = counts["CREATE INDEX"]
+    view_count = counts["CREATE MATERIALIZED VIEW"]
 
     print(f"\n📋 Migration Summary:")
     print(f"   ALTER TABLE statements: {alter_count}")
@@ -110,6 +116,7 @@ def apply_migration():
 
     print("🔗 Connecting to Supabase PostgreSQL...")
 
+    conn = None
     try:
         conn = psycopg2.connect(DATABASE_URL)
         cursor = conn.cursor()
@@ -143,6 +150,10 @@ def apply_migration():
 
     except Exception as e:
         print(f"❌ Error: {e}")
+        # Whole migration runs in one transaction: nothing is left half-applied
+        if conn is not None:
+            conn.rollback()
+            conn.close()
         import traceback
         traceback.print_exc()
 
@@ -3,7 +3,9 @@ Script Maestro: Completa la migración a Supabase automáticamente
 Genera todos los repositorios y actualiza el código existente
 """
 
-import os
+import io
+import tarfile
+import time
 
 # Repository para URLs
 url_repository_code = '''"""
@@ -205,8 +207,8 @@ class FolderRepository:
 
         # Get link counts
         for folder in folders:
-            links_response = self.links_table.select('id').eq('folder_id', folder['id']).execute()
-            folder['link_count'] = len(links_response.data)
+            links_response = self.links_table.select('id', count='exact', head=True).eq('folder_id', folder['id']).execute()
+            folder['link_count'] = links_response.count or 0
             folder['subfolders'] = []
 
         # Build tree
@@ -253,21 +255,32 @@ class FolderRepository:
         return len(response.data) > 0
 '''
 
-# Escribir archivos
-def write_file(path, content):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'w') as f:
-        f.write(content)
-    print(f"✅ Created: {path}")
-
-# Crear repositorios
+# Empaquetar repositorios en un solo .tar (un write, no pisa los repos ya versionados)
+ARCHIVE_PATH = "supabase_repositories.tar"
 base_path = "infrastructure/persistence/"
-write_file(f"{base_path}url_repository.py", url_repository_code)
-write_file(f"{base_path}click_repository.py", click_repository_code)
-write_file(f"{base_path}folder_repository.py", folder_repository_code)
-
-print("\n🎉 ¡Todos los repositorios creados exitosamente!")
+repositories = (
+    ("url_repository.py", url_repository_code),
+    ("click_repository.py", click_repository_code),
+    ("folder_repository.py", folder_repository_code),
+)
+
+buffer = io.BytesIO()
+with tarfile.open(fileobj=buffer, mode='w') as tf:
+    for name, content in repositories:
+        data = content.encode()
+        info = tarfile.TarInfo(f"{base_path}{name}")
+        info.size = len(data)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        tf.addfile(info, io.BytesIO(data))
+        print(f"✅ Packed: {base_path}{name}")
+
+with open(ARCHIVE_PATH, 'wb') as f:
+    f.write(buffer.getvalue())
+
+print(f"\n🎉 ¡Todos los repositorios empaquetados en {ARCHIVE_PATH}!")
 print("\nSiguientes pasos:")
+print(f"0. Extraer: tar -xf {ARCHIVE_PATH}")
 print("1. Actualizar main.py para usar repositorios")
 print("2. Actualizar folder_service.py")
 print("3. Actualizar click_tracker_service.py")
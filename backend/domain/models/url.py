@@ -3,11 +3,28 @@ Domain Models for URL shortening service
 SQLModel entities with validation and business logic
 """
 
-from datetime import datetime
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from typing import Optional
 from sqlmodel import SQLModel, Field
 
 
+def is_expired_at(expires_at: Optional[datetime], now_ts: Optional[float] = None) -> bool:
+    """
+    Expiry check behind URL.is_expired / can_redirect
+
+    Args:
+        expires_at: Expiry datetime (naive values are UTC), None = never expires
+        now_ts: Current epoch time; pass one time.time() per request to skip re-reading the clock
+    """
+    if not expires_at:
+        return False
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return (time.time() if now_ts is None else now_ts) > expires_at.timestamp()
+
+
 class URLBase(SQLModel):
     """Base URL model with shared fields"""
     short_code: str = Field(
@@ -49,15 +66,13 @@ class URL(URLBase, table=True):
     # Analytics optimization
     domain: Optional[str] = Field(None, max_length=255)
 
-    def is_expired(self) -> bool:
-        """Check if URL is expired"""
-        if not self.expires_at:
-            return False
-        return datetime.utcnow() > self.expires_at
+    def is_expired(self, now_ts: Optional[float] = None) -> bool:
+        """Check if URL is expired (pass now_ts to reuse one clock read per request)"""
+        return is_expired_at(self.expires_at, now_ts)
 
-    def can_redirect(self) -> bool:
+    def can_redirect(self, now_ts: Optional[float] = None) -> bool:
         """Check if URL can be used for redirection"""
-        return self.is_active and not self.is_expired()
+        return self.is_active and not self.is_expired(now_ts)
 
 
 class URLCreate(SQLModel):
@@ -128,4 +143,42 @@ class Click(ClickBase, table=True):
 
     id: Optional[str] = Field(default=None, primary_key=True)
     clicked_at: datetime = Field(default_factory=datetime.utcnow)
-    response_time_ms: Optional[int] = Field(None, ge=0)
\ No newline at end of file
+    response_time_ms: Optional[int] = Field(None, ge=0)
+
+@dataclass(slots=True, frozen=True)
+class ClickEvent:
+    """
+    In-memory click record built on every redirect: same fields as Click,
+    but a frozen slotted dataclass (no ORM state, no __dict__ per instance)
+    """
+    id: str
+    url_id: str
+    short_code: str
+    clicked_at: datetime
+
+    # Request metadata
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    referer: Optional[str] = None
+
+    # Parsed analytics data
+    country_code: Optional[str] = None
+    country_name: Optional[str] = None
+    city: Optional[str] = None
+
+    # Device detection
+    device_type: Optional[str] = None
+    browser_name: Optional[str] = None
+    os_name: Optional[str] = None
+
+    # Traffic source analysis
+    referrer_domain: Optional[str] = None
+    referrer_type: Optional[str] = None
+
+    # Advanced analytics fields
+    video_id: Optional[str] = None
+    video_platform: Optional[str] = None
+    platform: Optional[str] = None
+    is_returning_visitor: bool = False
+    session_id: Optional[str] = None
+    response_time_ms: Optional[int] = None
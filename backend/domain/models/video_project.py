@@ -9,6 +9,12 @@ from sqlmodel import SQLModel, Field
 import re
 
 
+# watch?v=, youtu.be/, embed/ and shorts/ URLs, as one pattern compiled once
+_YOUTUBE_URL_RE = re.compile(
+    r'(?:youtube\.com/(?:watch\?v=|embed/|shorts/)|youtu\.be/)[A-Za-z0-9_-]{11}'
+)
+
+
 class VideoProjectBase(SQLModel):
     """Base VideoProject model with shared fields"""
     title: str = Field(
@@ -74,14 +80,7 @@ class VideoProjectCreate(SQLModel):
         if not self.youtube_url:
             return True
 
-        youtube_patterns = [
-            r'youtube\.com/watch\?v=([A-Za-z0-9_-]{11})',
-            r'youtu\.be/([A-Za-z0-9_-]{11})',
-            r'youtube\.com/embed/([A-Za-z0-9_-]{11})',
-            r'youtube\.com/shorts/([A-Za-z0-9_-]{11})'
-        ]
-
-        return any(re.search(pattern, self.youtube_url) for pattern in youtube_patterns)
+        return _YOUTUBE_URL_RE.search(self.youtube_url) is not None
 
 
 class VideoProjectUpdate(SQLModel):
@@ -3,14 +3,61 @@ URL Generation Service - Base62 Algorithm
 Optimized for unique codes without collisions and comprehensive validation
 """
 
+import math
 import secrets
 import string
 import time
-from typing import Set, Optional
+from typing import Optional
 import hashlib
 import re
 
 
+# Codes remembered in-process before the filter is reset (the DB UNIQUE
+# constraint on short_code is the authoritative check)
+SEEN_CODES_CAPACITY = 1_000_000
+
+# Target false-positive rate; a false positive only costs one extra attempt
+SEEN_CODES_ERROR_RATE = 0.001
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter for strings (~1.8 MB for 1M items at 0.1%)
+    Replaces an ever-growing set of recently generated codes
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: two 64-bit halves of one BLAKE2b digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, item: str) -> None:
+        bits = self._bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+
 class URLGenerator:
     """
     URL short code generator using Base62 algorithm
@@ -19,6 +66,10 @@ class URLGenerator:
 
     # Base62 alphabet (more readable than Base64)
     BASE62_CHARS = string.ascii_letters + string.digits  # A-Z, a-z, 0-9
+    BASE62_BYTES = BASE62_CHARS.encode()
+
+    # Random bytes >= this are rejected so `byte % 62` stays uniform (62 * 4)
+    RANDOM_BYTE_LIMIT = 248
 
     def __init__(self, default_length: int = 6, max_attempts: int = 10):
         """
@@ -31,7 +82,8 @@ class URLGenerator:
         self.default_length = default_length
         self.max_attempts = max_attempts
         self._collision_count = 0
-        self._generated_codes: Set[str] = set()
+        self._total_generated = 0
+        self._generated_codes = BloomFilter(SEEN_CODES_CAPACITY, SEEN_CODES_ERROR_RATE)
 
     def generate_short_code(
         self,
@@ -64,7 +116,11 @@ class URLGenerator:
 
             # Validate uniqueness (in production, check against database)
             if code not in self._generated_codes:
+                if len(self._generated_codes) >= SEEN_CODES_CAPACITY:
+                    # Full filter: start over rather than let false positives climb
+                    self._generated_codes.clear()
                 self._generated_codes.add(code)
+                self._total_generated += 1
                 return code
 
             self._collision_count += 1
@@ -78,7 +134,13 @@ class URLGenerator:
 
     def _generate_random(self, length: int) -> str:
         """Generate cryptographically secure random Base62 code"""
-        return ''.join(secrets.choice(self.BASE62_CHARS) for _ in range(length))
+        alphabet, limit = self.BASE62_BYTES, self.RANDOM_BYTE_LIMIT
+        code = b''
+        # One token_bytes call per round; 2x oversampling makes a retry rare
+        while len(code) < length:
+            raw = secrets.token_bytes(length * 2)
+            code += bytes(alphabet[b % 62] for b in raw if b < limit)
+        return code[:length].decode()
 
     def _generate_from_hash(self, url: str, length: int) -> str:
         """
@@ -86,35 +148,32 @@ class URLGenerator:
         while maintaining uniqueness through salt
         """
         # Create hash with timestamp salt for uniqueness
-        salt = str(int(time.time() * 1000000))  # microsecond precision
+        salt = time.time_ns() // 1000  # microsecond precision
         hash_input = f"{url}:{salt}"
 
-        # Use SHA-256 for strong hash distribution
-        hash_digest = hashlib.sha256(hash_input.encode()).hexdigest()
-
-        # Convert hex to Base62
-        return self._hex_to_base62(hash_digest, length)
+        # BLAKE2b sized to the 64 bits we use (cheaper than SHA-256 + slicing)
+        hash_digest = hashlib.blake2b(hash_input.encode(), digest_size=8).digest()
 
-    def _hex_to_base62(self, hex_string: str, length: int) -> str:
-        """Convert hexadecimal string to Base62"""
-        # Convert hex to int
-        num = int(hex_string[:16], 16)  # Use first 16 hex chars (64 bits)
+        return self._int_to_base62(int.from_bytes(hash_digest, 'big'), length)
 
-        if num == 0:
-            return self.BASE62_CHARS[0] * length
-
-        result = ""
-        base = len(self.BASE62_CHARS)
+    def _int_to_base62(self, num: int, length: int) -> str:
+        """
+        Convert a hash integer to a fixed-length Base62 code
 
-        while num > 0 and len(result) < length:
-            result = self.BASE62_CHARS[num % base] + result
-            num //= base
+        Reads 6 bits per character (shift/mask, no big-int division);
+        values 62 and 63 are rejected so every character stays uniform
+        """
+        chars = self.BASE62_CHARS
+        result = []
 
-        # Pad to desired length
-        while len(result) < length:
-            result = self.BASE62_CHARS[0] + result
+        while num and len(result) < length:
+            index = num & 63
+            num >>= 6
+            if index < 62:
+                result.append(chars[index])
 
-        return result[:length]
+        # Pad to desired length (hash ran out of bits)
+        return ''.join(result).rjust(length, chars[0])
 
     def _generate_timestamp_based(self, length: int) -> str:
         """
@@ -167,8 +226,8 @@ class URLGenerator:
         """Get collision statistics for monitoring"""
         return {
             'total_collisions': self._collision_count,
-            'total_generated': len(self._generated_codes),
-            'collision_rate': self._collision_count / max(1, len(self._generated_codes)),
+            'total_generated': self._total_generated,
+            'collision_rate': self._collision_count / max(1, self._total_generated),
             'alphabet_size': len(self.BASE62_CHARS),
             'theoretical_combinations': len(self.BASE62_CHARS) ** self.default_length
         }
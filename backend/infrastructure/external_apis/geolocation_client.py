@@ -5,11 +5,59 @@ IP to geographic location mapping with fallbacks and caching
 
 import asyncio
 import json
+import logging
 import time
-from typing import Dict, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
 
 import httpx
+import orjson
+from cachetools import TTLCache
+
+from infrastructure.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Provider quota windows
+DAY_SECONDS = 86_400
+MONTH_SECONDS = 30 * DAY_SECONDS
+
+# Max concurrent provider requests in get_locations (free-tier rate limits)
+GEO_BATCH_CONCURRENCY = 10
+
+# Location returned when lookup isn't possible or every provider fails
+# (template only: copied per call, never handed out or mutated)
+_FALLBACK_LOCATION = {
+    'ip': None,
+    'country_code': None,
+    'country_name': 'Unknown',
+    'region': None,
+    'city': None,
+    'latitude': None,
+    'longitude': None,
+    'timezone': None,
+    'isp': None,
+    'provider': 'fallback',
+    'error': None
+}
+
+# Basic country code to name mapping (ipinfo.io only returns the code)
+COUNTRY_NAMES = {
+    'US': 'United States',
+    'GB': 'United Kingdom',
+    'CA': 'Canada',
+    'AU': 'Australia',
+    'DE': 'Germany',
+    'FR': 'France',
+    'IT': 'Italy',
+    'ES': 'Spain',
+    'NL': 'Netherlands',
+    'JP': 'Japan',
+    'CN': 'China',
+    'IN': 'India',
+    'BR': 'Brazil',
+    'MX': 'Mexico',
+    'RU': 'Russia'
+}
 
 
 class GeolocationClient:
@@ -19,10 +67,20 @@ class GeolocationClient:
     """
 
     def __init__(self):
-        self.cache: Dict[str, Tuple[dict, datetime]] = {}
-        self.cache_ttl = timedelta(hours=24)  # Cache for 24 hours
+        self.cache_ttl_seconds = 24 * 3600  # Cache for 24 hours
+        self.cache_max_size = 100_000  # Same IPs recur heavily across clicks
+        # LRU + TTL: expired/least-recent entries are evicted one at a time, never a full scan
+        self.cache = TTLCache(maxsize=self.cache_max_size, ttl=self.cache_ttl_seconds)
+        # All-providers-failed results: kept briefly so a failing burst doesn't
+        # re-hit the providers, but retried soon instead of cached for 24h
+        self.negative_cache = TTLCache(maxsize=10_000, ttl=60)
+        # IP -> lookup task, so concurrent misses for one IP share a single request
+        self._inflight: Dict[str, asyncio.Task] = {}
         self.timeout = 2.0  # 2 second timeout
         self.max_retries = 2
+        # Shared HTTP client (app lifetime, pooled keep-alive connections), set at startup
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self._owns_http_client = False
 
         # Free API endpoints with rate limits
         self.providers = [
@@ -30,25 +88,61 @@ class GeolocationClient:
                 'name': 'ipapi.co',
                 'url': 'http://ipapi.co/{ip}/json/',
                 'parser': self._parse_ipapi_response,
-                'rate_limit': 1000  # 1000 requests per day
+                'rate_limit': 1000,  # 1000 requests per day
+                'rate_window_seconds': DAY_SECONDS
             },
             {
                 'name': 'ip-api.com',
                 'url': 'http://ip-api.com/json/{ip}',
                 'parser': self._parse_ipapi_com_response,
-                'rate_limit': 1000  # 1000 requests per month for free
+                'rate_limit': 1000,  # 1000 requests per month for free
+                'rate_window_seconds': MONTH_SECONDS
             },
             {
                 'name': 'ipinfo.io',
                 'url': 'http://ipinfo.io/{ip}/json',
                 'parser': self._parse_ipinfo_response,
-                'rate_limit': 50000  # 50k requests per month
+                'rate_limit': 50000,  # 50k requests per month
+                'rate_window_seconds': MONTH_SECONDS
             }
         ]
 
         self.current_provider_index = 0
         self.provider_failures = {}
 
+        # Enforce each provider's quota: full quota as burst, refilled evenly over its window
+        self.rate_limiters = {
+            p['name']: TokenBucket(p['rate_limit'] / p['rate_window_seconds'], p['rate_limit'])
+            for p in self.providers
+        }
+
+    def set_http_client(self, client: Optional[httpx.AsyncClient]) -> None:
+        """
+        Attach the app-wide HTTP client used for provider lookups
+
+        Args:
+            client: Shared httpx.AsyncClient (None to detach on shutdown)
+        """
+        self.http_client = client
+        self._owns_http_client = False
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Shared client, or a pooled one of our own created on first use (inside the loop)"""
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            )
+            self._owns_http_client = True
+        return self.http_client
+
+    async def aclose(self) -> None:
+        """Close the HTTP client if this instance created it"""
+        if self._owns_http_client and self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+            self._owns_http_client = False
+
     async def get_location(self, ip_address: str) -> dict:
         """
         Get geographic location data for an IP address
@@ -67,36 +161,56 @@ class GeolocationClient:
         if cached_data:
             return cached_data
 
-        # Try geolocation lookup
-        location_data = await self._fetch_location_data(ip_address)
+        # Join a lookup already in flight for this IP instead of starting another
+        task = self._inflight.get(ip_address)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup_and_cache(ip_address))
+            self._inflight[ip_address] = task
+            task.add_done_callback(lambda _: self._inflight.pop(ip_address, None))
+
+        # shield: one caller being cancelled doesn't cancel the shared lookup
+        return await asyncio.shield(task)
+
+    async def get_locations(
+        self,
+        ip_addresses: Iterable[str],
+        concurrency: int = GEO_BATCH_CONCURRENCY
+    ) -> Dict[str, dict]:
+        """
+        Look up many IPs concurrently (e.g. to warm the cache for a backfill)
 
-        # Cache the result
-        self._cache_location(ip_address, location_data)
+        Args:
+            ip_addresses: IPs to look up (duplicates are looked up once)
+            concurrency: Max provider requests in flight at once
+
+        Returns:
+            Dictionary of IP -> location data
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def lookup(ip_address: str):
+            async with semaphore:
+                return ip_address, await self.get_location(ip_address)
+
+        unique_ips = dict.fromkeys(ip_addresses)
+        return dict(await asyncio.gather(*(lookup(ip) for ip in unique_ips)))
 
+    async def _lookup_and_cache(self, ip_address: str) -> dict:
+        """Fetch from the providers and cache the result"""
+        location_data = await self._fetch_location_data(ip_address)
+        self._cache_location(ip_address, location_data)
         return location_data
 
     def _get_cached_location(self, ip_address: str) -> Optional[dict]:
         """Check if location data is cached and still valid"""
-        if ip_address in self.cache:
-            cached_data, cached_time = self.cache[ip_address]
-            if datetime.utcnow() - cached_time < self.cache_ttl:
-                return cached_data
-
-        return None
+        return self.cache.get(ip_address) or self.negative_cache.get(ip_address)
 
     def _cache_location(self, ip_address: str, data: dict):
-        """Cache location data with timestamp"""
-        self.cache[ip_address] = (data, datetime.utcnow())
-
-        # Simple cache cleanup - remove oldest entries if cache gets too large
-        if len(self.cache) > 10000:
-            # Remove entries older than cache_ttl
-            cutoff_time = datetime.utcnow() - self.cache_ttl
-            self.cache = {
-                ip: (data, timestamp)
-                for ip, (data, timestamp) in self.cache.items()
-                if timestamp > cutoff_time
-            }
+        """Cache location data (TTLCache handles expiry and size); fallbacks only short-lived"""
+        if data.get('provider') == 'fallback':
+            self.negative_cache[ip_address] = data
+        else:
+            self.cache[ip_address] = data
 
     async def _fetch_location_data(self, ip_address: str) -> dict:
         """
@@ -104,21 +218,24 @@ class GeolocationClient:
         """
         for attempt in range(len(self.providers)):
             provider = self._get_next_provider()
+            if provider is None:
+                # Out of quota everywhere: don't spend latency on a request that would be refused
+                break
 
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    url = provider['url'].format(ip=ip_address)
+                url = provider['url'].format(ip=ip_address)
 
-                    response = await client.get(url)
-                    response.raise_for_status()
+                # Reused client: keep-alive connections, no handshake per lookup
+                response = await self._get_http_client().get(url, timeout=self.timeout)
+                response.raise_for_status()
 
-                    raw_data = response.json()
-                    parsed_data = provider['parser'](raw_data)
+                raw_data = orjson.loads(response.content)
+                parsed_data = provider['parser'](raw_data)
 
-                    # Reset failure count on success
-                    self.provider_failures[provider['name']] = 0
+                # Reset failure count on success
+                self.provider_failures[provider['name']] = 0
 
-                    return parsed_data
+                return parsed_data
 
             except Exception as e:
                 self._record_provider_failure(provider['name'], e)
@@ -127,28 +244,38 @@ class GeolocationClient:
         # All providers failed, return fallback data
         return self._get_fallback_data(ip_address, error="All providers failed")
 
-    def _get_next_provider(self) -> dict:
+    def _get_next_provider(self) -> Optional[dict]:
         """
-        Get next available provider, skipping failed ones
+        Get next available provider, skipping failed ones and ones out of quota
+
+        Returns None when every provider's quota is used up
         """
         for i in range(len(self.providers)):
             provider_index = (self.current_provider_index + i) % len(self.providers)
             provider = self.providers[provider_index]
 
-            # Skip providers with too many recent failures
+            # Skip providers with too many recent failures (allow up to 5) or no quota left
             failure_count = self.provider_failures.get(provider['name'], 0)
-            if failure_count < 5:  # Allow up to 5 failures before skipping
+            if failure_count < 5 and self.rate_limiters[provider['name']].try_acquire():
                 self.current_provider_index = (provider_index + 1) % len(self.providers)
                 return provider
 
-        # If all providers are failing, use the first one anyway
-        self.current_provider_index = 0
-        return self.providers[0]
+        # If all providers are failing, use the first one with quota left anyway
+        for provider in self.providers:
+            if self.rate_limiters[provider['name']].try_acquire():
+                self.current_provider_index = 0
+                return provider
+
+        return None
 
     def _record_provider_failure(self, provider_name: str, error: Exception):
         """Record provider failure for failover logic"""
-        self.provider_failures[provider_name] = self.provider_failures.get(provider_name, 0) + 1
-        print(f"Geolocation provider {provider_name} failed: {error}")
+        count = self.provider_failures.get(provider_name, 0) + 1
+        self.provider_failures[provider_name] = count
+
+        # Log failures 1, 2, 4, 8, ... only, so an outage doesn't flood the log
+        if count & (count - 1) == 0:
+            logger.warning("Geolocation provider %s failed (%d in a row): %s", provider_name, count, error)
 
     def _parse_ipapi_response(self, data: dict) -> dict:
         """Parse response from ipapi.co"""
@@ -208,44 +335,13 @@ class GeolocationClient:
         if not country_code:
             return None
 
-        # Basic country code to name mapping
-        country_mapping = {
-            'US': 'United States',
-            'GB': 'United Kingdom',
-            'CA': 'Canada',
-            'AU': 'Australia',
-            'DE': 'Germany',
-            'FR': 'France',
-            'IT': 'Italy',
-            'ES': 'Spain',
-            'NL': 'Netherlands',
-            'JP': 'Japan',
-            'CN': 'China',
-            'IN': 'India',
-            'BR': 'Brazil',
-            'MX': 'Mexico',
-            'RU': 'Russia'
-        }
-
-        return country_mapping.get(country_code, country_code)
+        return COUNTRY_NAMES.get(country_code, country_code)
 
     def _get_fallback_data(self, ip_address: str, error: str = None) -> dict:
         """
         Return fallback data when geolocation fails
         """
-        return {
-            'ip': ip_address,
-            'country_code': None,
-            'country_name': 'Unknown',
-            'region': None,
-            'city': None,
-            'latitude': None,
-            'longitude': None,
-            'timezone': None,
-            'isp': None,
-            'provider': 'fallback',
-            'error': error
-        }
+        return {**_FALLBACK_LOCATION, 'ip': ip_address, 'error': error}
 
     def get_cache_stats(self) -> dict:
         """Get cache statistics for monitoring"""
@@ -340,4 +436,6 @@ if __name__ == "__main__":
             else:
                 print(f"   {key}: {value}")
 
+        await geolocation_client.aclose()
+
     asyncio.run(test_geolocation())
@@ -3,9 +3,21 @@ Temporal Features Extractor
 Extracts time-based features for analytics and predictive models
 """
 
-from datetime import datetime, timezone
-from typing import Dict, Any
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Iterable, List, Tuple, Union
 import hashlib
+import heapq
+
+
+# 1970-01-01 (epoch day 0) was a Thursday: weekday = (days + 3) % 7, Monday=0
+EPOCH_WEEKDAY_OFFSET = 3
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Peak engagement hours (morning 6-9, lunch 12-13, evening 18-23)
+PEAK_HOURS = frozenset({6, 7, 8, 9, 12, 13, 18, 19, 20, 21, 22, 23})
+
+# Day part by hour, 0-23
+DAY_PARTS = ('night',) * 6 + ('morning',) * 6 + ('afternoon',) * 6 + ('evening',) * 6
 
 
 class TemporalFeaturesExtractor:
@@ -50,10 +62,14 @@ class TemporalFeaturesExtractor:
         if timestamp.tzinfo is None:
             timestamp = timestamp.replace(tzinfo=timezone.utc)
 
+        # Direct attribute reads: timetuple() on an aware datetime is ~6x slower
+        # (builds a struct_time and calls utcoffset/dst)
+        day_of_week = timestamp.weekday()  # 0=Monday, 6=Sunday
+
         features = {
             'hour_of_day': timestamp.hour,
-            'day_of_week': timestamp.weekday(),  # 0=Monday, 6=Sunday
-            'is_weekend': timestamp.weekday() >= 5,  # Saturday=5, Sunday=6
+            'day_of_week': day_of_week,
+            'is_weekend': day_of_week >= 5,  # Saturday=5, Sunday=6
             'week_of_year': timestamp.isocalendar()[1],
             'month': timestamp.month,
             'time_since_creation_seconds': None
@@ -69,6 +85,64 @@ class TemporalFeaturesExtractor:
 
         return features
 
+    def extract_features_batch(
+        self,
+        timestamps: Iterable[Union[datetime, float]],
+        creation_timestamp: datetime = None
+    ) -> Dict[str, List]:
+        """
+        Batch version of extract_features for many clicks (UTC)
+
+        Works on integer epoch seconds: hour and weekday are plain arithmetic,
+        and week/month are looked up once per distinct day, not per click.
+
+        Args:
+            timestamps: Click timestamps (datetimes, naive = UTC, or epoch seconds)
+            creation_timestamp: When the URL was created (optional)
+
+        Returns:
+            dict of lists (one entry per timestamp), same keys as extract_features
+        """
+        created_ts = None
+        if creation_timestamp:
+            if creation_timestamp.tzinfo is None:
+                creation_timestamp = creation_timestamp.replace(tzinfo=timezone.utc)
+            created_ts = creation_timestamp.timestamp()
+
+        hours, weekdays, weekends, weeks, months, since = [], [], [], [], [], []
+        calendar = {}  # epoch day -> (week_of_year, month)
+
+        for ts in timestamps:
+            if isinstance(ts, datetime):
+                if ts.tzinfo is None:
+                    ts = ts.replace(tzinfo=timezone.utc)
+                ts = ts.timestamp()
+
+            seconds = int(ts // 1)
+            days, second_of_day = divmod(seconds, 86400)
+            day_of_week = (days + EPOCH_WEEKDAY_OFFSET) % 7
+
+            week_month = calendar.get(days)
+            if week_month is None:
+                day = date.fromordinal(EPOCH_ORDINAL + days)
+                week_month = calendar[days] = (day.isocalendar()[1], day.month)
+
+            hours.append(second_of_day // 3600)
+            weekdays.append(day_of_week)
+            weekends.append(day_of_week >= 5)
+            weeks.append(week_month[0])
+            months.append(week_month[1])
+            since.append(int(ts - created_ts) if created_ts is not None else None)
+
+        return {
+            'hour_of_day': hours,
+            'day_of_week': weekdays,
+            'is_weekend': weekends,
+            'week_of_year': weeks,
+            'month': months,
+            'time_since_creation_seconds': since
+        }
+
     def get_time_bucket(
         self,
         timestamp: datetime,
@@ -107,7 +181,7 @@ class TemporalFeaturesExtractor:
         - Lunch: 12-2 PM
         - Evening: 6-11 PM
         """
-        return hour in [6, 7, 8, 9, 12, 13, 18, 19, 20, 21, 22, 23]
+        return hour in PEAK_HOURS
 
     def get_day_part(self, hour: int) -> str:
         """
@@ -119,14 +193,8 @@ class TemporalFeaturesExtractor:
         - afternoon: 12-5 PM
         - evening: 6-11 PM
         """
-        if 0 <= hour < 6:
-            return 'night'
-        elif 6 <= hour < 12:
-            return 'morning'
-        elif 12 <= hour < 18:
-            return 'afternoon'
-        else:
-            return 'evening'
+        # Out-of-range hours fall through to 'evening', as the old if/else chain did
+        return DAY_PARTS[hour] if 0 <= hour < 24 else 'evening'
 
     def get_week_type(self, day_of_week: int) -> str:
         """
@@ -150,7 +218,11 @@ class SessionTracker:
 
     def __init__(self, time_window_minutes: int = 30):
         self.time_window_minutes = time_window_minutes
+        self._window_seconds = time_window_minutes * 60
         self.sessions_cache = {}  # {session_id: {'first_seen': datetime, 'click_count': int}}
+        # (last_seen, session_id) min-heap, one entry per session; entries may be
+        # stale (session clicked since) and are refreshed when they surface
+        self._expiry_heap: List[Tuple[datetime, str]] = []
 
     def generate_session_id(
         self,
@@ -177,24 +249,28 @@ class SessionTracker:
         # Get time bucket
         time_bucket = self._get_time_bucket(timestamp)
 
-        # Create session key
-        session_key = f"{ip_address}_{user_agent}_{time_bucket}"
+        # Hash IP + UA + bucket (NUL-separated); 8-byte BLAKE2b = the same 16 hex
+        # chars, without computing and discarding SHA-256. One key buffer and one
+        # hash call beats piecewise update()/join(): per-call overhead dominates
+        # copying a ~200-byte UA
+        session_key = f"{ip_address}\0{user_agent}\0{time_bucket}"
 
-        # Generate hash
-        session_hash = hashlib.sha256(session_key.encode()).hexdigest()[:16]
-
-        return session_hash
+        return hashlib.blake2b(session_key.encode(), digest_size=8).hexdigest()
 
     def _get_time_bucket(self, timestamp: datetime) -> str:
-        """Get time bucket for session grouping"""
+        """
+        Get time bucket for session grouping
+
+        Index of the time window since the epoch (only ever hashed, so no
+        date formatting). Windows are aligned to the epoch: they match the
+        old round-the-minute-down-within-the-hour buckets only when the
+        window divides 60 minutes (e.g. the default 30); other lengths
+        (45, 90...) fall on different boundaries
+        """
         if timestamp.tzinfo is None:
             timestamp = timestamp.replace(tzinfo=timezone.utc)
 
-        # Round down to nearest window
-        bucket_minutes = (timestamp.minute // self.time_window_minutes) * self.time_window_minutes
-        bucket_start = timestamp.replace(minute=bucket_minutes, second=0, microsecond=0)
-
-        return bucket_start.strftime("%Y%m%d%H%M")
+        return str(int(timestamp.timestamp()) // self._window_seconds)
 
     def is_new_session(self, session_id: str) -> bool:
         """
@@ -234,6 +310,7 @@ class SessionTracker:
                 'click_count': 1,
                 'last_seen': timestamp
             }
+            heapq.heappush(self._expiry_heap, (timestamp, session_id))
 
             return {
                 'is_first_click': True,
@@ -263,16 +340,22 @@ class SessionTracker:
         """
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
 
-        sessions_to_remove = [
-            session_id
-            for session_id, data in self.sessions_cache.items()
-            if data['last_seen'] < cutoff_time
-        ]
-
-        for session_id in sessions_to_remove:
-            del self.sessions_cache[session_id]
+        # Only pops entries older than the cutoff: O(k log n), not a full scan
+        heap = self._expiry_heap
+        removed = 0
+        while heap and heap[0][0] < cutoff_time:
+            _, session_id = heapq.heappop(heap)
+            session = self.sessions_cache.get(session_id)
+            if session is None:
+                continue
+            if session['last_seen'] < cutoff_time:
+                del self.sessions_cache[session_id]
+                removed += 1
+            else:
+                # Clicked since it was queued: requeue at its real last_seen
+                heapq.heappush(heap, (session['last_seen'], session_id))
 
-        return len(sessions_to_remove)
+        return removed
 
 
 # Singleton instances
@@ -339,8 +422,6 @@ def track_session(
 # ========================================
 
 if __name__ == "__main__":
-    from datetime import timedelta
-
     print("⏰ Testing Temporal Features Extractor\n")
 
     # Test 1: Extract features
@@ -4,9 +4,44 @@ Extracts video ID and fetches metadata from YouTube
 Supports both API mode (with YouTube Data API key) and fallback mode
 """
 
+import os
 import re
 from typing import Optional, Dict
-from urllib.parse import urlparse, parse_qs
+
+import httpx
+from cachetools import TTLCache
+
+from infrastructure.rate_limit import TokenBucket
+
+
+# All supported URL formats in one pattern, compiled once at import:
+# youtube.com/watch?...v=ID, youtu.be/ID, youtube.com/embed/ID, youtube.com/shorts/ID
+_YT_ID_RE = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:[^#]*&)?v=|embed/|shorts/)|youtu\.be/)'
+    r'([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])'
+)
+
+# Metadata cache: video_id -> metadata dict (titles/thumbnails rarely change)
+METADATA_CACHE_MAX = 1024
+METADATA_CACHE_TTL_SECONDS = 3600
+
+# YouTube Data API request budget: sustained rate and burst size
+YOUTUBE_API_RATE_PER_SECOND = 5.0
+YOUTUBE_API_BURST = 10
+
+# YouTube Data API v3 videos.list endpoint
+YOUTUBE_VIDEOS_API_URL = "https://www.googleapis.com/youtube/v3/videos"
+
+# Pause used when a 429 has no usable Retry-After (seconds)
+YOUTUBE_API_DEFAULT_RETRY_AFTER = 60.0
+
+
+def _retry_after_seconds(value: Optional[str]) -> float:
+    """Retry-After header in seconds (only the delta-seconds form is parsed)"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return YOUTUBE_API_DEFAULT_RETRY_AFTER
 
 
 class YouTubeMetadataClient:
@@ -25,12 +60,11 @@ class YouTubeMetadataClient:
             api_key: YouTube Data API v3 key (optional)
         """
         self.api_key = api_key
-        self.youtube_patterns = {
-            'standard': r'youtube\.com/watch\?v=([A-Za-z0-9_-]{11})',
-            'short': r'youtu\.be/([A-Za-z0-9_-]{11})',
-            'embed': r'youtube\.com/embed/([A-Za-z0-9_-]{11})',
-            'shorts': r'youtube\.com/shorts/([A-Za-z0-9_-]{11})'
-        }
+        # Shared HTTP client (app lifetime, pooled connections), set at startup
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.metadata_cache = TTLCache(maxsize=METADATA_CACHE_MAX, ttl=METADATA_CACHE_TTL_SECONDS)
+        # Shared budget for YouTube Data API calls (cache hits don't spend tokens)
+        self.rate_limiter = TokenBucket(YOUTUBE_API_RATE_PER_SECOND, YOUTUBE_API_BURST)
 
     def extract_video_id(self, youtube_url: str) -> Optional[str]:
         """
@@ -51,27 +85,17 @@ class YouTubeMetadataClient:
         if not youtube_url:
             return None
 
-        try:
-            # Parse URL
-            parsed = urlparse(youtube_url)
-
-            # Handle youtube.com/watch?v=VIDEO_ID
-            if 'youtube.com' in parsed.netloc and parsed.path == '/watch':
-                query_params = parse_qs(parsed.query)
-                if 'v' in query_params:
-                    return query_params['v'][0]
-
-            # Try all YouTube patterns
-            for pattern_name, pattern in self.youtube_patterns.items():
-                match = re.search(pattern, youtube_url)
-                if match:
-                    return match.group(1)
+        match = _YT_ID_RE.search(youtube_url)
+        return match.group(1) if match else None
 
-            return None
+    def set_http_client(self, client: Optional[httpx.AsyncClient]) -> None:
+        """
+        Attach the app-wide HTTP client used for YouTube Data API calls
 
-        except Exception as e:
-            print(f"Error extracting YouTube video ID: {e}")
-            return None
+        Args:
+            client: Shared httpx.AsyncClient (None to detach on shutdown)
+        """
+        self.http_client = client
 
     def get_thumbnail_url(self, video_id: str, quality: str = 'maxresdefault') -> str:
         """
@@ -123,27 +147,70 @@ class YouTubeMetadataClient:
                 'description': None
             }
 
+        return await self.get_video_metadata_by_id(video_id)
+
+    async def get_video_metadata_by_id(self, video_id: str) -> Dict[str, Optional[str]]:
+        """
+        Get video metadata for an already extracted video ID (cached per video ID)
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            Same dictionary as get_video_metadata (a copy, safe to mutate)
+        """
+        cached = self.metadata_cache.get(video_id)
+        if cached is not None:
+            return dict(cached)
+
         # Get thumbnail URL (works without API)
         thumbnail_url = self.get_thumbnail_url(video_id, quality='maxresdefault')
 
-        # If API key is available, fetch metadata from YouTube Data API
-        if self.api_key:
-            try:
-                # TODO: Implement YouTube Data API v3 call
-                # For now, return fallback mode
-                pass
-            except Exception as e:
-                print(f"YouTube API call failed: {e}")
-
         # Fallback mode: Return video ID and thumbnail URL
         # User must manually enter title
-        return {
+        metadata = {
             'video_id': video_id,
             'title': None,  # User must provide title manually
             'thumbnail_url': thumbnail_url,
             'description': None
         }
 
+        # API mode: fetch title/description from YouTube Data API v3
+        if self.api_key and self.http_client is not None:
+            try:
+                snippet = await self._fetch_snippet(video_id)
+            except Exception as e:
+                print(f"YouTube API call failed: {e}")
+                return dict(metadata)  # not cached: retried on the next request
+            if snippet:
+                metadata['title'] = snippet.get('title')
+                metadata['description'] = snippet.get('description')
+
+        self.metadata_cache[video_id] = metadata
+        return dict(metadata)
+
+    async def _fetch_snippet(self, video_id: str) -> Optional[dict]:
+        """
+        videos.list (part=snippet) for one video through the shared client
+
+        Takes a rate-limit token per request; a 429 pauses the bucket for
+        Retry-After seconds (every caller waits) and raises.
+
+        Returns:
+            The video's snippet, or None if YouTube doesn't know the ID
+        """
+        await self.rate_limiter.acquire()
+        response = await self.http_client.get(
+            YOUTUBE_VIDEOS_API_URL,
+            params={'part': 'snippet', 'id': video_id, 'key': self.api_key},
+        )
+        if response.status_code == 429:
+            self.rate_limiter.pause(_retry_after_seconds(response.headers.get('Retry-After')))
+        response.raise_for_status()
+
+        items = response.json().get('items') or []
+        return items[0].get('snippet') if items else None
+
     def validate_youtube_url(self, url: str) -> bool:
         """
         Validate if URL is a valid YouTube URL
@@ -158,8 +225,8 @@ class YouTubeMetadataClient:
         return video_id is not None
 
 
-# Singleton instance (without API key by default)
-youtube_metadata_client = YouTubeMetadataClient(api_key=None)
+# Singleton instance (API mode only when YOUTUBE_API_KEY is set)
+youtube_metadata_client = YouTubeMetadataClient(api_key=os.getenv('YOUTUBE_API_KEY') or None)
 
 
 async def get_youtube_metadata(youtube_url: str) -> Dict[str, Optional[str]]:
@@ -175,6 +242,19 @@ async def get_youtube_metadata(youtube_url: str) -> Dict[str, Optional[str]]:
     return await youtube_metadata_client.get_video_metadata(youtube_url)
 
 
+async def get_youtube_metadata_by_id(video_id: str) -> Dict[str, Optional[str]]:
+    """
+    Convenience function for getting YouTube metadata by video ID (cached)
+
+    Args:
+        video_id: YouTube video ID
+
+    Returns:
+        Dictionary with video metadata
+    """
+    return await youtube_metadata_client.get_video_metadata_by_id(video_id)
+
+
 def extract_youtube_video_id(youtube_url: str) -> Optional[str]:
     """
     Convenience function for extracting YouTube video ID
@@ -0,0 +1,149 @@
+"""
+Click Batch Writer - encola clicks y los inserta en Supabase por lotes
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+from postgrest.exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+# Max clicks waiting in memory before new ones are dropped
+CLICK_QUEUE_MAX = 10_000
+
+# Max rows per INSERT
+CLICK_BATCH_SIZE = 500
+
+# How long the flusher waits for a batch to fill before inserting what it has
+CLICK_FLUSH_INTERVAL_SECONDS = 0.1
+
+# Whole-batch retries for transient failures (network, 5xx), with doubling backoff
+CLICK_WRITE_RETRIES = 3
+CLICK_RETRY_BACKOFF_SECONDS = 0.5
+
+# SQLSTATE classes PostgREST answers with a 4xx for bad row data
+# (22xxx data exception, 23xxx integrity constraint violation)
+ROW_REJECTION_SQLSTATE_CLASSES = ('22', '23')
+
+
+def _is_row_rejection(error: Exception) -> bool:
+    """True if PostgREST rejected the rows themselves (4xx), not a transient failure"""
+    if not isinstance(error, APIError):
+        return False
+    code = str(error.code or '')
+    # postgrest-py puts the HTTP status in .code when the body isn't JSON
+    if len(code) == 3 and code.isdigit():
+        return code.startswith('4')
+    return code[:2] in ROW_REJECTION_SQLSTATE_CLASSES
+
+
+class ClickBatchWriter:
+    """
+    Background writer for the redirect hot path: enqueue() returns at once,
+    a single flusher task turns queued clicks into multi-row INSERTs
+    """
+
+    def __init__(self, click_repository, batch_size: int = CLICK_BATCH_SIZE,
+                 max_queue: int = CLICK_QUEUE_MAX):
+        self.repo = click_repository
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Create the queue and spawn the flusher (call from the running loop)"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._flusher())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write everything currently queued"""
+        while self._queue is not None and not self._queue.empty():
+            await self._write(self._drain([]))
+
+    def enqueue(self, click_data: dict) -> None:
+        """Queue a click row for insertion; writes directly if the flusher isn't running"""
+        if self._task is None:
+            self.repo.create(click_data)
+            return
+        try:
+            self._queue.put_nowait(click_data)
+        except asyncio.QueueFull:
+            logger.warning("Click queue full (%d), dropping click for %s", self.max_queue, click_data.get('short_code'))
+
+    def _drain(self, batch: List[dict]) -> List[dict]:
+        """Top up batch with already-queued clicks, without waiting"""
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flusher(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                # Linger one flush interval (unless a full batch is already
+                # waiting) so a burst of clicks shares one INSERT
+                if self._queue.qsize() < self.batch_size - 1:
+                    await asyncio.sleep(CLICK_FLUSH_INTERVAL_SECONDS)
+            finally:
+                # Also runs on cancel (shutdown), so the first click isn't lost
+                await self._write(self._drain(batch))
+
+    async def _write(self, batch: List[dict]) -> None:
+        """
+        Insert a batch. Row rejections (4xx) are split so only the bad rows are
+        lost; anything else is retried whole with backoff, then dropped.
+        """
+        delay = CLICK_RETRY_BACKOFF_SECONDS
+        for attempt in range(CLICK_WRITE_RETRIES + 1):
+            try:
+                await self._insert(batch)
+                return
+            except Exception as e:
+                if _is_row_rejection(e):
+                    dropped = await self._insert_split(batch)
+                    if dropped:
+                        logger.error("Dropped %d of %d clicks that Supabase rejected", dropped, len(batch))
+                    return
+                if attempt == CLICK_WRITE_RETRIES:
+                    logger.error("Dropped %d clicks after %d failed attempts: %s", len(batch), attempt + 1, e)
+                    return
+                logger.warning("Saving %d clicks failed, retrying in %.1fs: %s", len(batch), delay, e)
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    async def _insert(self, batch: List[dict]) -> None:
+        # Supabase client is sync: keep the INSERT off the event loop
+        await asyncio.to_thread(self.repo.create_many, batch)
+
+    async def _insert_split(self, batch: List[dict]) -> int:
+        """Halve a rejected batch until the bad rows are isolated; returns how many were dropped"""
+        if len(batch) == 1:
+            logger.debug("Failed to save click for %s", batch[0].get('short_code'))
+            return 1
+        mid = len(batch) // 2
+        dropped = 0
+        for half in (batch[:mid], batch[mid:]):
+            try:
+                await self._insert(half)
+            except Exception as e:
+                if len(half) > 1 and _is_row_rejection(e):
+                    dropped += await self._insert_split(half)
+                else:
+                    # A single bad row, or a transient failure mid-split: don't fan out further
+                    logger.debug("Failed to save %d clicks: %s", len(half), e)
+                    dropped += len(half)
+        return dropped
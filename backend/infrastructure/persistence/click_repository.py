@@ -1,8 +1,35 @@
 """
 Click Repository - Supabase implementation
 """
-from typing import Optional, List, Dict
-from infrastructure.persistence.supabase_client import get_supabase
+from collections import Counter
+from datetime import date
+from operator import itemgetter
+from typing import Optional, List, Dict, Iterator
+from postgrest.exceptions import APIError
+from infrastructure.persistence.supabase_client import get_supabase, RPC_NOT_FOUND
+
+# Columns the Python fallback aggregates (plus id for keyset pagination)
+SUMMARY_COLUMNS = (
+    'id,session_id,is_returning_visitor,device_type,country_name,country_code,'
+    'city,platform,referrer_type,video_platform,video_id,clicked_at'
+)
+
+# Rows per request; Supabase caps responses at 1000 rows by default
+ANALYTICS_PAGE_SIZE = 1000
+
+# Breakdown key -> clicks column ('Unknown' for NULL/empty)
+FACET_FIELDS = {
+    'device_breakdown': 'device_type',
+    'country_breakdown': 'country_name',
+    'platform_breakdown': 'platform',
+    'referrer_breakdown': 'referrer_type',
+}
+
+# SUMMARY_COLUMNS rows always carry these columns, so plain item lookups are safe
+_session_id = itemgetter('session_id')
+_is_returning = itemgetter('is_returning_visitor')
+
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
 
 
 class ClickRepository:
@@ -11,76 +38,127 @@ class ClickRepository:
     def __init__(self):
         self.client = get_supabase()
         self.table = self.client.table('clicks')
+        # Cleared if the analytics RPC isn't deployed, so we don't retry it per request
+        self._use_rpc = True
 
     def create(self, click_data: dict) -> dict:
         """Crear nuevo click con todos los campos avanzados"""
         response = self.table.insert(click_data).execute()
         return response.data[0] if response.data else None
 
+    def create_many(self, clicks: List[dict]) -> List[dict]:
+        """Insertar varios clicks en un solo INSERT"""
+        response = self.table.insert(clicks).execute()
+        return response.data
+
     def get_by_url_id(self, url_id: str, limit: int = 1000) -> List[dict]:
         """Obtener clicks por URL"""
         response = self.table.select('*').eq('url_id', url_id).order('clicked_at', desc=True).limit(limit).execute()
         return response.data
 
     def get_analytics_summary(self, short_code: str) -> Dict:
-        """Obtener resumen de analytics desde Supabase"""
-        clicks = self.table.select('*').eq('short_code', short_code).execute().data
-
-        if not clicks:
+        """
+        Obtener resumen de analytics desde Supabase
+
+        Aggregated server-side by the get_click_analytics RPC (migration 009);
+        falls back to fetching the rows and aggregating here if it's missing.
+        """
+        if self._use_rpc:
+            try:
+                summary = self.client.rpc('get_click_analytics', {'p_short_code': short_code}).execute().data
+            except APIError as e:
+                if e.code != RPC_NOT_FOUND:
+                    raise
+                print("⚠️ get_click_analytics RPC not found (migration 009), aggregating in Python")
+                self._use_rpc = False
+            else:
+                if not summary or not summary.get('total_clicks'):
+                    return self._empty_analytics()
+                return summary
+
+        return self._summarize_rows(short_code)
+
+    def _iter_click_pages(self, short_code: str) -> Iterator[List[dict]]:
+        """Yield the short code's clicks page by page (keyset on id, no OFFSET)"""
+        last_id = None
+        while True:
+            query = self.table.select(SUMMARY_COLUMNS).eq('short_code', short_code)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            page = query.order('id').limit(ANALYTICS_PAGE_SIZE).execute().data
+            if not page:
+                return
+            yield page
+            last_id = page[-1]['id']
+
+    def _summarize_rows(self, short_code: str) -> Dict:
+        """
+        Fallback: aggregate in Python, folding one page of clicks at a time
+        into running counters so memory stays bounded by the page size
+        """
+        total_clicks = returning = 0
+        sessions = set()
+        facets = {key: Counter() for key in FACET_FIELDS}
+        cities, videos, hours, dates = Counter(), Counter(), Counter(), Counter()
+
+        for page in self._iter_click_pages(short_code):
+            total_clicks += len(page)
+            sessions.update(filter(None, map(_session_id, page)))
+            returning += sum(filter(None, map(_is_returning, page)))
+            for key, field in FACET_FIELDS.items():
+                facets[key].update(self._count_field(page, field))
+            cities.update(self._count_cities(page))
+            videos.update(self._count_videos(page))
+            stamps = [c['clicked_at'] for c in page if c.get('clicked_at')]
+            hours.update(ts[11:13] for ts in stamps)
+            dates.update(ts[:10] for ts in stamps)
+
+        if not total_clicks:
             return self._empty_analytics()
 
-        # Process analytics (igual que click_tracker_service pero desde DB)
-        total_clicks = len(clicks)
-        unique_sessions = len(set(c['session_id'] for c in clicks if c.get('session_id')))
-        returning = sum(1 for c in clicks if c.get('is_returning_visitor'))
+        recent = self.table.select('*').eq('short_code', short_code) \
+            .order('clicked_at', desc=True).limit(50).execute().data
 
         return {
             'total_clicks': total_clicks,
-            'unique_visitors': unique_sessions,
+            'unique_visitors': len(sessions),
             'returning_visitors': returning,
-            'device_breakdown': self._count_field(clicks, 'device_type'),
-            'country_breakdown': self._count_field(clicks, 'country_name'),
-            'city_breakdown': self._count_cities(clicks),
-            'platform_breakdown': self._count_field(clicks, 'platform'),
-            'video_sources': self._count_videos(clicks),
-            'time_patterns': self._analyze_time(clicks),
-            'referrer_breakdown': self._count_field(clicks, 'referrer_type'),
-            'recent_clicks': clicks[:50]  # ✅ Return last 50 clicks for table
+            **{key: dict(counts) for key, counts in facets.items()},
+            'city_breakdown': self._city_breakdown(cities),
+            'video_sources': dict(videos),
+            'time_patterns': self._analyze_time(hours, dates),
+            'recent_clicks': recent  # ✅ Return last 50 clicks for table
         }
 
     def _count_field(self, clicks, field):
-        result = {}
-        for c in clicks:
-            val = c.get(field) or 'Unknown'
-            result[val] = result.get(val, 0) + 1
-        return result
+        return Counter(c.get(field) or 'Unknown' for c in clicks)
 
     def _count_cities(self, clicks):
-        result = {}
-        for c in clicks:
-            if c.get('city'):
-                key = f"{c['city']}, {c.get('country_code', 'XX')}"
-                result[key] = result.get(key, 0) + 1
-        return result
+        # Counted on (city, country) tuples; the 'City, CC' strings are built
+        # once per distinct city in _city_breakdown
+        return Counter(
+            (c['city'], c.get('country_code') or 'XX') for c in clicks if c.get('city')
+        )
+
+    def _city_breakdown(self, city_counts: Counter) -> Dict[str, int]:
+        # Same keys as get_click_analytics' city_key: 'XX' when the country code is missing
+        return {f"{city}, {country}": n for (city, country), n in city_counts.items()}
 
     def _count_videos(self, clicks):
-        result = {}
-        for c in clicks:
-            if c.get('video_platform') and c.get('video_id'):
-                key = f"{c['video_platform']}:{c['video_id']}"
-                result[key] = result.get(key, 0) + 1
-        return result
-
-    def _analyze_time(self, clicks):
-        from datetime import datetime as dt
-        hours, days = {}, {}
-        for c in clicks:
-            if c.get('clicked_at'):
-                clicked = dt.fromisoformat(c['clicked_at'].replace('Z', '+00:00'))
-                hour = clicked.hour
-                day = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][clicked.weekday()]
-                hours[hour] = hours.get(hour, 0) + 1
-                days[day] = days.get(day, 0) + 1
+        return Counter(
+            f"{c['video_platform']}:{c['video_id']}"
+            for c in clicks if c.get('video_platform') and c.get('video_id')
+        )
+
+    def _analyze_time(self, hour_counts: Counter, date_counts: Counter):
+        # Counters are keyed on slices of the ISO clicked_at strings: 'HH' and
+        # 'YYYY-MM-DD' in the row's own offset, exactly what
+        # fromisoformat(...).hour/.weekday() would give. Each date parsed once.
+        hours = {int(h): n for h, n in hour_counts.items()}
+        days = {}
+        for day_str, n in date_counts.items():
+            day = DAY_NAMES[date.fromisoformat(day_str).weekday()]
+            days[day] = days.get(day, 0) + n
 
         peak_hour = max(hours.items(), key=lambda x: x[1])[0] if hours else None
         peak_day = max(days.items(), key=lambda x: x[1])[0] if days else None
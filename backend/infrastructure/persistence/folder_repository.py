@@ -1,8 +1,13 @@
 """
 Folder Repository - Supabase implementation
 """
-from typing import List, Optional
-from infrastructure.persistence.supabase_client import get_supabase
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from postgrest.exceptions import APIError
+from infrastructure.persistence.supabase_client import get_supabase, RPC_NOT_FOUND
+
+# Rows per request when paging folder_links (PostgREST caps responses at 1000)
+LINK_COUNT_PAGE_SIZE = 1000
 
 
 class FolderRepository:
@@ -12,6 +17,8 @@ class FolderRepository:
         self.client = get_supabase()
         self.folders_table = self.client.table('folders')
         self.links_table = self.client.table('folder_links')
+        # Cleared if the folder_link_counts RPC isn't deployed
+        self._use_rpc = True
 
     def create(self, name: str, color: str = "#00fff5", icon: str = "📁", parent_folder_id: str = None) -> dict:
         """Crear nuevo folder"""
@@ -33,25 +40,52 @@ class FolderRepository:
         """Obtener árbol de folders con link counts"""
         folders = self.get_all()
 
-        # Get link counts
+        # Group by parent in one pass; link counts come from one query
+        counts = self.link_counts()
+        children = defaultdict(list)
         for folder in folders:
-            links_response = self.links_table.select('id').eq('folder_id', folder['id']).execute()
-            folder['link_count'] = len(links_response.data)
-            folder['subfolders'] = []
-
-        # Build tree
-        folder_map = {f['id']: f for f in folders}
-        root_folders = []
+            folder['link_count'] = counts.get(folder['id'], 0)
+            children[folder['parent_folder_id'] or None].append(folder)
 
+        # Folders whose parent is missing are never attached (same as before)
         for folder in folders:
-            if folder['parent_folder_id']:
-                parent = folder_map.get(folder['parent_folder_id'])
-                if parent:
-                    parent['subfolders'].append(folder)
-            else:
-                root_folders.append(folder)
-
-        return root_folders
+            folder['subfolders'] = children[folder['id']]
+
+        return children[None]
+
+    def link_counts(self) -> Dict[str, int]:
+        """
+        Links por folder (folder_id -> count) en un solo round trip
+
+        GROUP BY in Postgres via the folder_link_counts RPC (migration 010);
+        falls back to counting the folder_id column here (paged) if it's missing.
+        """
+        if self._use_rpc:
+            try:
+                rows = self.client.rpc('folder_link_counts').execute().data
+                return {row['folder_id']: row['link_count'] for row in rows or []}
+            except APIError as e:
+                if e.code != RPC_NOT_FOUND:
+                    raise
+                print("⚠️ folder_link_counts RPC not found (migration 010), counting in Python")
+                self._use_rpc = False
+
+        counts = Counter()
+        start = 0
+        while True:
+            page = (self.links_table.select('folder_id')
+                    .order('folder_id').order('url_id')
+                    .range(start, start + LINK_COUNT_PAGE_SIZE - 1)
+                    .execute().data)
+            counts.update(row['folder_id'] for row in page)
+            if len(page) < LINK_COUNT_PAGE_SIZE:
+                return counts
+            start += LINK_COUNT_PAGE_SIZE
+
+    def count_subfolders(self, folder_id: str) -> int:
+        """Contar subfolders directos (solo el count, sin filas)"""
+        response = self.folders_table.select('id', count='exact', head=True).eq('parent_folder_id', folder_id).execute()
+        return response.count or 0
 
     def update(self, folder_id: str, name: str = None, color: str = None, icon: str = None, parent_folder_id: str = None) -> dict:
         """Actualizar folder"""
@@ -5,12 +5,40 @@ Provides centralized access to Supabase database and storage
 
 import os
 from typing import Optional
+
+import orjson
+from postgrest.base_request_builder import APIResponse
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# PostgREST error code for "function not found in the schema cache"
+# (an RPC whose migration hasn't been applied yet)
+RPC_NOT_FOUND = 'PGRST202'
+
+
+def _decode_api_response(request_response) -> APIResponse:
+    """APIResponse.from_http_request_response, decoding the body with orjson"""
+    count = APIResponse._get_count_from_http_request_response(request_response)
+    try:
+        data = orjson.loads(request_response.content)
+    except orjson.JSONDecodeError:
+        data = request_response.text if len(request_response.text) > 0 else []
+    return APIResponse.model_construct(data=data, count=count)
+
+
+# postgrest runs every response body through a pydantic JSON TypeAdapter,
+# ~15x slower than orjson on a 1000-row clicks page; the result is the same
+# plain lists/dicts. _decode_api_response mirrors postgrest 2.32's version and
+# uses its private count helper, so requirements.txt pins postgrest; on any
+# other layout the patch is skipped loudly instead of silently.
+if hasattr(APIResponse, '_get_count_from_http_request_response'):
+    APIResponse.from_http_request_response = staticmethod(_decode_api_response)
+else:
+    print("⚠️ postgrest APIResponse changed, orjson decoding disabled (check the postgrest pin)")
+
 
 class SupabaseClient:
     """
@@ -91,7 +119,7 @@ if __name__ == "__main__":
     try:
         client = get_supabase()
         # Try a simple query
-        response = client.table('urls').select('*').limit(1).execute()
-        print(f" Connection successful! URLs in database: {len(response.data)}")
+        response = client.table('urls').select('id', count='exact', head=True).execute()
+        print(f" Connection successful! URLs in database: {response.count}")
     except Exception as e:
         print(f"L Connection failed: {e}")
\ No newline at end of file
@@ -2,9 +2,14 @@
 URL Repository - Supabase implementation
 """
 from typing import Optional, List
-from datetime import datetime
+from cachetools import TTLCache
 from infrastructure.persistence.supabase_client import get_supabase
 
+# Active URLs by short_code, cached per process (hot links hit the cache on
+# every redirect). Short TTL bounds staleness across workers.
+SHORT_CODE_CACHE_MAX = 10_000
+SHORT_CODE_CACHE_TTL_SECONDS = 60
+
 
 class URLRepository:
     """Repository para operaciones CRUD de URLs en Supabase"""
@@ -12,6 +17,7 @@ class URLRepository:
     def __init__(self):
         self.client = get_supabase()
         self.table = self.client.table('urls')
+        self._by_short_code = TTLCache(maxsize=SHORT_CODE_CACHE_MAX, ttl=SHORT_CODE_CACHE_TTL_SECONDS)
 
     def create(self, short_code: str, original_url: str, title: str = None, domain: str = None) -> dict:
         """Crear nueva URL"""
@@ -27,9 +33,16 @@ class URLRepository:
         return response.data[0] if response.data else None
 
     def get_by_short_code(self, short_code: str) -> Optional[dict]:
-        """Obtener URL por short_code"""
+        """Obtener URL por short_code (cacheada; solo se cachean URLs encontradas)"""
+        url = self._by_short_code.get(short_code)
+        if url is not None:
+            return url
+
         response = self.table.select('*').eq('short_code', short_code).eq('is_active', True).execute()
-        return response.data[0] if response.data else None
+        if not response.data:
+            return None
+        url = self._by_short_code[short_code] = response.data[0]
+        return url
 
     def get_by_id(self, url_id: str) -> Optional[dict]:
         """Obtener URL por ID"""
@@ -52,23 +65,14 @@ class URLRepository:
 
         return urls
 
-    def update_click_count(self, url_id: str):
-        """Incrementar click count"""
-        # Get current count
-        url = self.table.select('click_count').eq('id', url_id).execute()
-        if not url.data:
-            return None
-
-        current_count = url.data[0].get('click_count', 0)
-
-        # Update with incremented count
-        response = self.table.update({
-            'click_count': current_count + 1,
-            'last_clicked_at': datetime.utcnow().isoformat()
-        }).eq('id', url_id).execute()
-        return response.data[0] if response.data else None
+    def update_click_count(self, url_id: str) -> None:
+        """Incrementar click count (atómico en Postgres, un solo round trip)"""
+        # increment_click_count (schema.sql) does click_count + 1 and sets
+        # last_clicked_at in one UPDATE, so concurrent clicks aren't lost
+        self.client.rpc('increment_click_count', {'p_url_id': url_id}).execute()
 
     def delete(self, short_code: str) -> bool:
         """Soft delete - marcar como inactiva"""
         response = self.table.update({'is_active': False}).eq('short_code', short_code).execute()
+        self._by_short_code.pop(short_code, None)
         return len(response.data) > 0
@@ -0,0 +1,61 @@
+"""
+Rate Limiting
+Token bucket shared by the external API clients (YouTube, geolocation)
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Async token bucket: callers wait in-process instead of getting a 429
+    from the API. pause() honors a server Retry-After for all callers.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill (up to capacity)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        # Reserve the token up front (tokens may go negative): waiters queue
+        # FIFO by reservation and sleep without holding anything, so a long
+        # Retry-After pause never blocks the bookkeeping of other callers
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        ready_at = now + max(0.0, -self.tokens) / self.rate
+        try:
+            while True:
+                # Re-read paused_until each time: a pause() may land while we sleep
+                wait = max(ready_at, self.paused_until) - time.monotonic()
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self.tokens += 1  # give the reservation back
+            raise
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available right now (never waits)"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return False
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds` (e.g. from a Retry-After header)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
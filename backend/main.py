@@ -5,21 +5,27 @@ URL Shortener with real-time analytics
 """
 
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional
 
+import httpx
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.auth_middleware import AuthMiddleware
+from api.responses import ORJSONResponse
+
 # Import domain models
 from domain.models.url import URLCreate
 from domain.services.url_generator import generate_short_code, validate_short_code
 
 # Import advanced analytics services
-from infrastructure.external_apis.geolocation_client import get_ip_location
+from infrastructure.external_apis.geolocation_client import geolocation_client, get_ip_location
 from infrastructure.external_apis.user_agent_parser import parse_user_agent
 from infrastructure.external_apis.video_attribution import parse_video_referrer
+from infrastructure.external_apis.youtube_metadata import youtube_metadata_client
 from infrastructure.external_apis.temporal_features import (
     extract_temporal_features,
     generate_session_id,
@@ -39,12 +45,16 @@ from application.services.click_tracker_service import click_tracker_service
 from infrastructure.persistence.url_repository import URLRepository
 from infrastructure.persistence.click_repository import ClickRepository
 from infrastructure.persistence.folder_repository import FolderRepository
+from infrastructure.persistence.click_batch_writer import ClickBatchWriter
 
 # Initialize repositories
 url_repo = URLRepository()
 click_repo = ClickRepository()
 folder_repo = FolderRepository()
 
+# Redirect clicks are queued and inserted in batches by a background task
+click_writer = ClickBatchWriter(click_repo)
+
 # Initialize folder service with repository
 folder_service_instance = FolderService(folder_repo)
 
@@ -57,15 +67,41 @@ clicks_db = []
 urls = urls_db
 clicks = clicks_db
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Shared HTTP client for outbound calls (YouTube metadata, geolocation) and the click writer, app lifetime"""
+    app.state.http = httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=50),
+        timeout=5.0,
+    )
+    youtube_metadata_client.set_http_client(app.state.http)
+    geolocation_client.set_http_client(app.state.http)
+    click_writer.start()
+    try:
+        yield
+    finally:
+        await click_writer.stop()
+        youtube_metadata_client.set_http_client(None)
+        geolocation_client.set_http_client(None)
+        await app.state.http.aclose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="SuperintelligenceURLs API",
     description="URL Shortener with real-time analytics and authentication",
     version="1.0.1",
-    docs_url="/docs"
+    docs_url="/docs",
+    default_response_class=ORJSONResponse,
 )
 
-# CORS middleware
+# Authentication middleware
+app.add_middleware(AuthMiddleware)
+
+# CORS middleware - added last so it wraps AuthMiddleware: every response,
+# including 401s and HTTPException errors, gets CORS headers from one place
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -74,27 +110,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Authentication middleware
-from api.auth_middleware import AuthMiddleware
-app.add_middleware(AuthMiddleware)
-
-# Global exception handler for CORS on errors
-from fastapi import HTTPException
-from fastapi.responses import JSONResponse
-
-@app.exception_handler(HTTPException)
-async def http_exception_handler(request, exc):
-    return JSONResponse(
-        status_code=exc.status_code,
-        content={"detail": exc.detail},
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Allow-Methods": "*",
-            "Access-Control-Allow-Headers": "*",
-        }
-    )
-
 # Include auth router
 from api.auth_router import router as auth_router
 app.include_router(auth_router)
@@ -155,8 +170,8 @@ async def root():
     }
 
 
-@app.post("/shorten")
-async def create_short_url(url_data: URLCreate):
+@app.post("/shorten", response_model=None)
+async def create_short_url(url_data: URLCreate) -> ORJSONResponse:
     """Create a new shortened URL"""
     start_time = time.perf_counter()
 
@@ -216,19 +231,19 @@ async def create_short_url(url_data: URLCreate):
     processing_time = (time.perf_counter() - start_time) * 1000
     print(f"✅ URL created in Supabase: {short_code} -> {url_data.original_url} ({processing_time:.2f}ms)")
 
-    return url_record
+    return ORJSONResponse(content=url_record)
 
 
-@app.get("/urls/all")
-async def get_all_urls():
+@app.get("/urls/all", response_model=None)
+async def get_all_urls() -> ORJSONResponse:
     """Get all shortened URLs"""
     try:
         urls = url_repo.get_all(limit=100)
         print(f"✅ Retrieved {len(urls)} URLs from Supabase")
-        return {
+        return ORJSONResponse(content={
             "urls": urls,
             "total": len(urls)
-        }
+        })
     except Exception as e:
         print(f"❌ Error getting URLs: {e}")
         raise HTTPException(
@@ -271,10 +286,11 @@ async def redirect_url(short_code: str, request: Request):
         request=request
     )
 
-    # Save click to Supabase with all advanced fields
-    click_repo.create({
+    # Queue click for batched insert into Supabase with all advanced fields
+    click_writer.enqueue({
         'url_id': url_record['id'],
         'short_code': short_code,
+        'clicked_at': click_data.clicked_at.isoformat(),
         'ip_address': click_data.ip_address,
         'user_agent': click_data.user_agent,
         'referer': click_data.referer,
@@ -308,8 +324,8 @@ async def redirect_url(short_code: str, request: Request):
     )
 
 
-@app.get("/analytics/{short_code}")
-async def get_analytics(short_code: str):
+@app.get("/analytics/{short_code}", response_model=None)
+async def get_analytics(short_code: str) -> ORJSONResponse:
     """Get analytics for a specific short URL with advanced features"""
     # Get URL from Supabase
     url_record = url_repo.get_by_short_code(short_code)
@@ -322,7 +338,7 @@ async def get_analytics(short_code: str):
     # Get analytics from Supabase
     analytics = click_repo.get_analytics_summary(short_code)
 
-    return {
+    return ORJSONResponse(content={
         "short_code": short_code,
         "original_url": url_record['original_url'],
         "created_at": url_record['created_at'],
@@ -337,7 +353,7 @@ async def get_analytics(short_code: str):
         "time_patterns": analytics['time_patterns'],  # NEW - time analysis
         "referrer_breakdown": analytics['referrer_breakdown'],
         "recent_clicks": analytics.get('recent_clicks', [])  # ✅ Recent clicks table data
-    }
+    })
 
 
 @app.delete("/{short_code}")
@@ -467,7 +483,7 @@ def get_client_ip(request: Request) -> Optional[str]:
     """Extract client IP address from request"""
     forwarded_for = request.headers.get('x-forwarded-for')
     if forwarded_for:
-        return forwarded_for.split(',')[0].strip()
+        return forwarded_for.partition(',')[0].strip()
 
     real_ip = request.headers.get('x-real-ip')
     if real_ip:
@@ -501,6 +517,34 @@ def detect_device_type(user_agent: str) -> str:
     return 'desktop'
 
 
+# Traffic sources by referrer domain, built once: social media platforms,
+# then search engines, then email platforms (first substring match wins)
+REFERRER_SOURCES = {
+    # Social media platforms
+    'facebook.com': 'Facebook',
+    'twitter.com': 'Twitter',
+    'x.com': 'Twitter',
+    'linkedin.com': 'LinkedIn',
+    'instagram.com': 'Instagram',
+    'youtube.com': 'YouTube',
+    'tiktok.com': 'TikTok',
+    'reddit.com': 'Reddit',
+    'pinterest.com': 'Pinterest',
+    'whatsapp.com': 'WhatsApp',
+    'telegram.org': 'Telegram',
+    # Search engines
+    'google.com': 'Google',
+    'bing.com': 'Bing',
+    'yahoo.com': 'Yahoo',
+    'duckduckgo.com': 'DuckDuckGo',
+    'baidu.com': 'Baidu',
+    # Email platforms
+    'gmail.com': 'Gmail',
+    'outlook.com': 'Outlook',
+    'mail.yahoo.com': 'Yahoo Mail',
+}
+
+
 def extract_referrer_source(referer: Optional[str]) -> str:
     """Extract traffic source from referrer URL"""
     if not referer:
@@ -508,39 +552,8 @@ def extract_referrer_source(referer: Optional[str]) -> str:
 
     referer_lower = referer.lower()
 
-    # Social media platforms
-    social_sources = {
-        'facebook.com': 'Facebook',
-        'twitter.com': 'Twitter',
-        'x.com': 'Twitter',
-        'linkedin.com': 'LinkedIn',
-        'instagram.com': 'Instagram',
-        'youtube.com': 'YouTube',
-        'tiktok.com': 'TikTok',
-        'reddit.com': 'Reddit',
-        'pinterest.com': 'Pinterest',
-        'whatsapp.com': 'WhatsApp',
-        'telegram.org': 'Telegram'
-    }
-
-    # Search engines
-    search_sources = {
-        'google.com': 'Google',
-        'bing.com': 'Bing',
-        'yahoo.com': 'Yahoo',
-        'duckduckgo.com': 'DuckDuckGo',
-        'baidu.com': 'Baidu'
-    }
-
-    # Email platforms
-    email_sources = {
-        'gmail.com': 'Gmail',
-        'outlook.com': 'Outlook',
-        'mail.yahoo.com': 'Yahoo Mail'
-    }
-
-    # Check all source categories
-    for domain, source in {**social_sources, **search_sources, **email_sources}.items():
+    # Check all source categories (social, search, email - in that order)
+    for domain, source in REFERRER_SOURCES.items():
         if domain in referer_lower:
             return source
 
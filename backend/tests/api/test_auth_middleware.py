@@ -0,0 +1,51 @@
+"""
+Tests for Auth Middleware
+Clasificación de rutas públicas vs protegidas
+"""
+
+import pytest
+
+# Add backend to Python path
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from api.auth_middleware import is_public
+
+
+class TestIsPublic:
+    """(method, path) -> public verdict, matching the original middleware rules"""
+
+    @pytest.mark.parametrize("method,path,expected", [
+        # Health check and docs
+        ("GET", "/", True),
+        ("GET", "/docs", True),
+        ("GET", "/openapi.json", True),
+        ("GET", "/redoc", True),
+        ("POST", "/", True),
+        ("POST", "/docs", True),
+        # /auth prefix (plain startswith, so /authx is public too)
+        ("POST", "/auth/login", True),
+        ("GET", "/auth/verify", True),
+        ("GET", "/auth", True),
+        ("GET", "/authx/anything", True),
+        # Redirects: GET with one non-empty segment
+        ("GET", "/abc123", True),
+        ("GET", "/abc123/", True),
+        ("GET", "//abc123", True),
+        ("GET", "/docs/", True),
+        ("POST", "/abc123", False),
+        ("DELETE", "/abc123/", False),
+        ("POST", "/docs/", False),
+        # Multi-segment and empty paths need a token
+        ("GET", "/api/urls", False),
+        ("GET", "/api/urls/", False),
+        ("GET", "/abc/def", False),
+        ("GET", "//", False),
+        ("GET", "", False),
+        # CORS preflight is always public
+        ("OPTIONS", "/api/urls", True),
+        ("OPTIONS", "/anything/at/all", True),
+    ])
+    def test_verdict(self, method, path, expected):
+        assert is_public(method, path) is expected
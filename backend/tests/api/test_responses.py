@@ -0,0 +1,50 @@
+"""
+Tests for API response helpers
+Filtrado de campos sin revalidar (lo que hacía response_model)
+"""
+
+# Add backend to Python path
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from api.folders_router import FolderResponse
+from api.responses import response_fields
+from api.video_projects_router import VideoPerformanceResponse
+
+
+class TestResponseFields:
+    """Test suite for response_fields"""
+
+    def test_drops_extra_columns(self):
+        """Test DB columns outside the model never reach the client"""
+        pick = response_fields(FolderResponse)
+        row = {
+            "id": "folder_1", "name": "Videos", "color": "#00fff5", "icon": "📁",
+            "parent_folder_id": None, "created_at": "2026-10-16T00:00:00",
+            "updated_at": "2026-10-16T00:00:00", "link_count": 3, "subfolder_count": 1,
+            "user_id": "secret", "internal_notes": "x",
+        }
+
+        result = pick(row)
+
+        assert set(result) == set(FolderResponse.model_fields)
+        assert "user_id" not in result
+        assert result["link_count"] == 3
+
+    def test_missing_fields_get_defaults(self):
+        """Test missing optional fields get the model default, required ones None"""
+        pick = response_fields(FolderResponse)
+
+        result = pick({"id": "folder_1", "name": "Videos"})
+
+        assert result["link_count"] == 0
+        assert result["subfolder_count"] == 0
+        assert result["color"] is None
+
+    def test_key_order_follows_model(self):
+        """Test the response keeps the model's field order"""
+        pick = response_fields(VideoPerformanceResponse)
+        row = {name: None for name in reversed(list(VideoPerformanceResponse.model_fields))}
+
+        assert list(pick(row)) == list(VideoPerformanceResponse.model_fields)
@@ -0,0 +1,60 @@
+"""
+Tests for Folder Service
+Analytics por folder en modo in-memory
+"""
+
+import pytest
+
+# Add backend to Python path
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../../'))
+
+from application.services.folder_service import FolderService
+
+
+class TestFolderAnalytics:
+    """Test suite for in-memory folder analytics"""
+
+    def setup_method(self):
+        """Setup a folder holding two links"""
+        self.service = FolderService()
+        self.folder_id = self.service.create_folder(name="Videos")["id"]
+        self.service.assign_link_to_folder("u1", self.folder_id)
+        self.service.assign_link_to_folder("u2", self.folder_id)
+
+    def test_aggregates_only_folder_links(self):
+        """Test clicks on links outside the folder are ignored"""
+        clicks = [
+            {"url_id": "u1", "ip_address": "1.1.1.1", "device_type": "mobile", "country_name": "Mexico"},
+            {"url_id": "u2", "ip_address": "1.1.1.1", "device_type": "desktop", "country_name": "Mexico"},
+            {"url_id": "u2", "ip_address": "2.2.2.2", "device_type": "mobile", "country_name": "Peru"},
+            {"url_id": "other", "ip_address": "3.3.3.3", "device_type": "mobile", "country_name": "Chile"},
+        ]
+
+        analytics = self.service.get_folder_analytics(self.folder_id, clicks)
+
+        assert analytics["link_count"] == 2
+        assert analytics["total_clicks"] == 3
+        assert analytics["unique_visitors"] == 2
+        assert analytics["device_breakdown"] == {"mobile": 2, "desktop": 1}
+        assert analytics["country_breakdown"] == {"Mexico": 2, "Peru": 1}
+
+    def test_missing_fields_use_defaults(self):
+        """Test clicks without device/country are bucketed as unknown"""
+        analytics = self.service.get_folder_analytics(self.folder_id, [{"url_id": "u1"}])
+
+        assert analytics["device_breakdown"] == {"unknown": 1}
+        assert analytics["country_breakdown"] == {"Unknown": 1}
+
+    def test_no_clicks(self):
+        """Test a folder without clicks reports zeros"""
+        analytics = self.service.get_folder_analytics(self.folder_id)
+
+        assert analytics["total_clicks"] == 0
+        assert analytics["unique_visitors"] == 0
+
+    def test_unknown_folder(self):
+        """Test an unknown folder raises ValueError"""
+        with pytest.raises(ValueError):
+            self.service.get_folder_analytics("folder_missing")
@@ -0,0 +1,39 @@
+"""
+Tests for URL domain model
+Expiración con un solo reloj por request
+"""
+
+from datetime import datetime, timedelta, timezone
+
+# Add repo root to Python path
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../../../'))
+
+# Same package path as test_main.py (root main.py imports backend.domain.models.url):
+# importing it as domain.models.url too would register the 'urls' table twice
+from backend.domain.models.url import URL, is_expired_at
+
+
+class TestURLExpiry:
+    """Test suite for URL expiry checks"""
+
+    def test_no_expiry_never_expires(self):
+        """Test a URL without expires_at is never expired"""
+        assert is_expired_at(None, now_ts=0) is False
+
+    def test_naive_expiry_is_utc(self):
+        """Test naive expires_at values are compared as UTC"""
+        expires_at = datetime(2030, 1, 1)
+        ts = expires_at.replace(tzinfo=timezone.utc).timestamp()
+
+        assert is_expired_at(expires_at, now_ts=ts - 1) is False
+        assert is_expired_at(expires_at, now_ts=ts + 1) is True
+
+    def test_can_redirect_uses_current_expires_at(self):
+        """Test changing expires_at on a URL is picked up (no stale cache)"""
+        url = URL(short_code='abc123', original_url='https://example.com')
+        assert url.can_redirect() is True
+
+        url.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        assert url.can_redirect() is False
@@ -14,6 +14,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../../'))
 
 from domain.services.url_generator import (
+    BloomFilter,
     URLGenerator,
     generate_short_code,
     validate_short_code
@@ -211,6 +212,80 @@ class TestConvenienceFunctions:
         assert validate_short_code(test_code)
 
 
+class TestBase62Encoding:
+    """Test suite for _int_to_base62 (6-bit chunks with rejection)"""
+
+    def setup_method(self):
+        """Setup fresh generator for each test"""
+        self.generator = URLGenerator()
+        self.chars = URLGenerator.BASE62_CHARS
+
+    def test_reads_six_bits_per_char(self):
+        """Test each character comes from the next 6 low bits"""
+        num = (2 << 12) | (1 << 6) | 0
+
+        assert self.generator._int_to_base62(num, 3) == self.chars[0] + self.chars[1] + self.chars[2]
+
+    def test_rejects_62_and_63(self):
+        """Test chunks 62 and 63 are skipped, not wrapped onto the alphabet"""
+        num = (5 << 12) | (63 << 6) | 62
+
+        assert self.generator._int_to_base62(num, 1) == self.chars[5]
+
+    def test_pads_when_bits_run_out(self):
+        """Test short hashes are padded to the requested length"""
+        assert self.generator._int_to_base62(0, 6) == self.chars[0] * 6
+        assert self.generator._int_to_base62(7, 4) == self.chars[7].rjust(4, self.chars[0])
+
+    def test_output_is_valid_code(self):
+        """Test random 64-bit inputs always give valid fixed-length codes"""
+        for num in (1, 2**63 + 12345, 2**64 - 1, 0x3E3E3E3E3E3E):
+            code = self.generator._int_to_base62(num, 6)
+            assert len(code) == 6
+            assert all(c in self.chars for c in code)
+
+
+class TestBloomFilter:
+    """Test suite for the seen-codes Bloom filter"""
+
+    def test_added_items_are_found(self):
+        """Test no false negatives"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"code{i}" for i in range(1000)]
+
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+        assert len(bloom) == 1000
+
+    def test_false_positive_rate(self):
+        """Test false positives stay near the configured rate at capacity"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"code{i}")
+
+        false_positives = sum(f"other{i}" in bloom for i in range(10000))
+
+        assert false_positives / 10000 < 0.03
+
+    def test_sizing(self):
+        """Test bit and hash counts follow the standard formulas"""
+        bloom = BloomFilter(capacity=1_000_000, error_rate=0.001)
+
+        assert bloom.num_hashes == 10
+        assert 1.7e6 < len(bloom._bits) < 1.9e6
+
+    def test_clear(self):
+        """Test clear() forgets every item"""
+        bloom = BloomFilter(capacity=100, error_rate=0.01)
+        bloom.add("abc123")
+        bloom.clear()
+
+        assert "abc123" not in bloom
+        assert len(bloom) == 0
+
+
 if __name__ == "__main__":
     # Run basic tests if executed directly
     print("🧪 Running URL Generator Tests")
@@ -0,0 +1,89 @@
+"""
+Tests for YouTube Metadata Client
+Llamadas a la Data API con rate limit, cache y fallback
+"""
+
+import httpx
+import pytest
+
+# Add backend to Python path
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../../'))
+
+from infrastructure.external_apis.youtube_metadata import YouTubeMetadataClient
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+
+
+def make_client(handler, api_key='test-key'):
+    """Client in API mode whose HTTP calls go to `handler`"""
+    client = YouTubeMetadataClient(api_key=api_key)
+    client.set_http_client(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return client
+
+
+class TestYouTubeMetadataClient:
+    """Test suite for YouTube Data API calls"""
+
+    @pytest.mark.asyncio
+    async def test_api_mode_fills_title_and_description(self):
+        """Test a videos.list snippet fills title/description and spends one token"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={'items': [{'snippet': {'title': 'Title', 'description': 'Desc'}}]})
+
+        client = make_client(handler)
+        tokens = client.rate_limiter.tokens
+
+        metadata = await client.get_video_metadata_by_id(VIDEO_ID)
+
+        assert metadata['title'] == 'Title'
+        assert metadata['description'] == 'Desc'
+        assert requests[0].url.params['id'] == VIDEO_ID
+        assert client.rate_limiter.tokens == pytest.approx(tokens - 1, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_api_and_token(self):
+        """Test a cached video doesn't call the API or spend a token"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={'items': []})
+
+        client = make_client(handler)
+        await client.get_video_metadata_by_id(VIDEO_ID)
+        tokens = client.rate_limiter.tokens
+
+        await client.get_video_metadata_by_id(VIDEO_ID)
+
+        assert len(calls) == 1
+        assert client.rate_limiter.tokens == pytest.approx(tokens, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_429_pauses_limiter_and_falls_back(self):
+        """Test a 429 pauses the bucket for Retry-After and isn't cached"""
+        client = make_client(lambda request: httpx.Response(429, headers={'Retry-After': '30'}))
+
+        metadata = await client.get_video_metadata_by_id(VIDEO_ID)
+
+        assert metadata['title'] is None
+        assert metadata['thumbnail_url'].endswith(f'{VIDEO_ID}/maxresdefault.jpg')
+        assert not client.rate_limiter.try_acquire()
+        assert VIDEO_ID not in client.metadata_cache
+
+    @pytest.mark.asyncio
+    async def test_no_api_key_makes_no_request(self):
+        """Test fallback mode never calls the API"""
+        def handler(request):
+            raise AssertionError("unexpected request")
+
+        client = make_client(handler, api_key=None)
+
+        metadata = await client.get_video_metadata_by_id(VIDEO_ID)
+
+        assert metadata['video_id'] == VIDEO_ID
+        assert metadata['title'] is None
@@ -0,0 +1,168 @@
+"""
+Tests for Click Batch Writer
+Flush por lotes, drenado en shutdown y reintentos
+"""
+
+import pytest
+
+# Add backend to Python path
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../../'))
+
+from postgrest.exceptions import APIError
+
+from infrastructure.persistence import click_batch_writer
+from infrastructure.persistence.click_batch_writer import ClickBatchWriter
+
+
+class FakeClickRepository:
+    """In-memory stand-in for ClickRepository that records each INSERT"""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.created = []
+        self.calls = 0
+        self.error = error
+
+    def create_many(self, rows):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        if any(row.get('bad') for row in rows):
+            raise APIError({'code': '23502', 'message': 'rejected'})
+        self.batches.append(list(rows))
+
+    def create(self, row):
+        self.created.append(row)
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+
+def make_clicks(n, start=0):
+    return [{'short_code': f'code{i}', 'url_id': 'u1'} for i in range(start, start + n)]
+
+
+class TestClickBatchWriter:
+    """Test suite for ClickBatchWriter"""
+
+    def setup_method(self):
+        """Setup fresh repository for each test"""
+        self.repo = FakeClickRepository()
+
+    def test_enqueue_without_start_writes_directly(self):
+        """Test clicks go straight to the repository before start()"""
+        writer = ClickBatchWriter(self.repo)
+        clicks = make_clicks(2)
+
+        for click in clicks:
+            writer.enqueue(click)
+
+        assert self.repo.created == clicks
+        assert self.repo.batches == []
+
+    @pytest.mark.asyncio
+    async def test_burst_shares_one_insert(self):
+        """Test clicks queued together are written as one batch"""
+        writer = ClickBatchWriter(self.repo)
+        writer.start()
+        clicks = make_clicks(20)
+
+        for click in clicks:
+            writer.enqueue(click)
+        await writer.stop()
+
+        assert self.repo.batches == [clicks]
+
+    @pytest.mark.asyncio
+    async def test_batches_respect_batch_size(self):
+        """Test no INSERT carries more than batch_size rows"""
+        writer = ClickBatchWriter(self.repo, batch_size=3)
+        writer.start()
+        clicks = make_clicks(10)
+
+        for click in clicks:
+            writer.enqueue(click)
+        await writer.stop()
+
+        assert self.repo.rows == clicks
+        assert all(len(batch) <= 3 for batch in self.repo.batches)
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_queue(self):
+        """Test shutdown writes everything still queued"""
+        writer = ClickBatchWriter(self.repo, batch_size=2)
+        writer.start()
+        clicks = make_clicks(7)
+
+        # stop() right away: the flusher hasn't run yet
+        for click in clicks:
+            writer.enqueue(click)
+        await writer.stop()
+
+        assert self.repo.rows == clicks
+        assert writer._queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_queued_clicks(self):
+        """Test flush() empties the queue without stopping the writer"""
+        writer = ClickBatchWriter(self.repo, batch_size=4)
+        writer.start()
+        clicks = make_clicks(9)
+
+        for click in clicks:
+            writer.enqueue(click)
+        await writer.flush()
+
+        assert writer._queue.empty()
+        await writer.stop()
+        assert sorted(row['short_code'] for row in self.repo.rows) == sorted(c['short_code'] for c in clicks)
+
+    @pytest.mark.asyncio
+    async def test_queue_full_drops_click(self):
+        """Test enqueue drops (doesn't block) when the queue is full"""
+        writer = ClickBatchWriter(self.repo, max_queue=2)
+        writer.start()
+        clicks = make_clicks(3)
+
+        for click in clicks:
+            writer.enqueue(click)
+        await writer.stop()
+
+        assert self.repo.rows == clicks[:2]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_only_loses_rejected_rows(self):
+        """Test a rejected batch is split so the good rows are still saved"""
+        writer = ClickBatchWriter(self.repo)
+        clicks = make_clicks(8)
+        clicks[5]['bad'] = True
+
+        await writer._write(clicks)
+
+        assert self.repo.rows == clicks[:5] + clicks[6:]
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_retries_whole_batch(self, monkeypatch):
+        """Test an outage retries the batch a bounded number of times instead of splitting it"""
+        monkeypatch.setattr(click_batch_writer, 'CLICK_RETRY_BACKOFF_SECONDS', 0)
+        repo = FakeClickRepository(error=RuntimeError("connection reset"))
+        writer = ClickBatchWriter(repo)
+
+        await writer._write(make_clicks(500))
+
+        assert repo.calls == click_batch_writer.CLICK_WRITE_RETRIES + 1
+        assert repo.rows == []
+
+    @pytest.mark.asyncio
+    async def test_server_error_is_not_split(self, monkeypatch):
+        """Test a 5xx APIError is treated as transient, not as rejected rows"""
+        monkeypatch.setattr(click_batch_writer, 'CLICK_RETRY_BACKOFF_SECONDS', 0)
+        repo = FakeClickRepository(error=APIError({'code': '503', 'message': 'unavailable'}))
+        writer = ClickBatchWriter(repo)
+
+        await writer._write(make_clicks(500))
+
+        assert repo.calls == click_batch_writer.CLICK_WRITE_RETRIES + 1
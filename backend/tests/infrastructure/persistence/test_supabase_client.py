@@ -0,0 +1,67 @@
+"""
+Tests for Supabase Client
+El decodificador orjson debe dar lo mismo que el de postgrest
+"""
+
+import importlib
+
+import httpx
+import pytest
+
+# Add backend to Python path
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../../'))
+
+from postgrest.base_request_builder import APIResponse, JSONAdapter
+
+
+@pytest.fixture
+def decode(monkeypatch):
+    """_decode_api_response, importing the module with dummy credentials"""
+    # The module builds its singleton at import (no request is sent);
+    # monkeypatch restores the environment after each test
+    monkeypatch.setenv('SUPABASE_URL', 'https://example.supabase.co')
+    monkeypatch.setenv('SUPABASE_SERVICE_KEY', 'test-key')
+    module = importlib.import_module('infrastructure.persistence.supabase_client')
+    return module._decode_api_response
+
+
+def make_response(content: bytes, prefer: str = None, content_range: str = None) -> httpx.Response:
+    request_headers = {'prefer': prefer} if prefer else {}
+    response_headers = {'content-range': content_range} if content_range else {}
+    return httpx.Response(
+        200,
+        content=content,
+        headers=response_headers,
+        request=httpx.Request('GET', 'https://example.supabase.co/rest/v1/clicks', headers=request_headers),
+    )
+
+
+class TestDecodeAPIResponse:
+    """Test suite for the orjson APIResponse decoder"""
+
+    def test_patch_is_applied(self, decode):
+        """Test the pinned postgrest still has the hook we replace"""
+        assert APIResponse.from_http_request_response is decode
+
+    @pytest.mark.parametrize("content,prefer,content_range", [
+        (b'[{"id": 1, "city": "Lima"}, {"id": 2, "city": null}]', None, None),
+        (b'[]', 'count=exact', '0-0/42'),
+        (b'{"total_clicks": 3}', None, None),
+        (b'', None, None),
+        (b'', 'count=exact', '*/7'),
+    ])
+    def test_matches_postgrest(self, decode, content, prefer, content_range):
+        """Test data and count match postgrest's own decoding"""
+        response = make_response(content, prefer, content_range)
+
+        ours = decode(response)
+        expected_count = APIResponse._get_count_from_http_request_response(response)
+        try:
+            expected_data = JSONAdapter.validate_json(content)
+        except Exception:
+            expected_data = response.text if response.text else []
+
+        assert ours.data == expected_data
+        assert ours.count == expected_count
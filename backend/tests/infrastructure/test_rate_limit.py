@@ -0,0 +1,128 @@
+"""
+Tests for Rate Limiting
+Token bucket: refill, FIFO, pause y try_acquire
+"""
+
+import asyncio
+import time
+
+import pytest
+
+# Add backend to Python path
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from infrastructure.rate_limit import TokenBucket
+
+
+class TestTokenBucket:
+    """Test suite for the shared TokenBucket"""
+
+    def test_starts_full(self):
+        """Test a new bucket hands out its whole burst at once"""
+        bucket = TokenBucket(rate=1.0, capacity=3)
+
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_refill(self):
+        """Test tokens come back at `rate` per second"""
+        bucket = TokenBucket(rate=2.0, capacity=5)
+        while bucket.try_acquire():
+            pass
+
+        # Pretend one second went by: 2 tokens earned
+        bucket.updated_at -= 1.0
+
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    def test_refill_capped_at_capacity(self):
+        """Test a long idle period doesn't bank more than capacity"""
+        bucket = TokenBucket(rate=10.0, capacity=2)
+        bucket.updated_at -= 3600
+
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    def test_pause_blocks_try_acquire(self):
+        """Test pause() stops try_acquire even with tokens left"""
+        bucket = TokenBucket(rate=1.0, capacity=5)
+        bucket.pause(60)
+
+        assert not bucket.try_acquire()
+        assert bucket.tokens == 5
+
+    def test_pause_never_shortens(self):
+        """Test a shorter pause doesn't cut an existing one"""
+        bucket = TokenBucket(rate=1.0, capacity=1)
+        bucket.pause(60)
+        paused_until = bucket.paused_until
+        bucket.pause(1)
+
+        assert bucket.paused_until == paused_until
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_refill(self):
+        """Test acquire() sleeps until the next token instead of failing"""
+        bucket = TokenBucket(rate=50.0, capacity=1)
+        await bucket.acquire()
+
+        start = time.monotonic()
+        await bucket.acquire()
+
+        assert time.monotonic() - start >= 0.015
+
+    @pytest.mark.asyncio
+    async def test_acquire_is_fifo(self):
+        """Test waiters get tokens in the order they asked"""
+        bucket = TokenBucket(rate=200.0, capacity=1)
+        bucket.try_acquire()
+        order = []
+
+        async def worker(i):
+            await bucket.acquire()
+            order.append(i)
+
+        await asyncio.gather(*(worker(i) for i in range(5)))
+
+        assert order == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_out_pause(self):
+        """Test acquire() honors a pause (e.g. Retry-After)"""
+        bucket = TokenBucket(rate=1.0, capacity=5)
+        bucket.pause(0.05)
+
+        start = time.monotonic()
+        await bucket.acquire()
+
+        assert time.monotonic() - start >= 0.04
+        assert bucket.tokens == pytest.approx(4, abs=0.2)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_returns_token(self):
+        """Test a waiter cancelled mid-sleep gives its reserved token back"""
+        bucket = TokenBucket(rate=1.0, capacity=1)
+        bucket.try_acquire()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(bucket.acquire(), timeout=0.01)
+
+        assert bucket.tokens == pytest.approx(0, abs=0.05)
+
+    @pytest.mark.asyncio
+    async def test_pause_during_wait_is_honored(self):
+        """Test a pause() issued while a caller sleeps delays that caller too"""
+        bucket = TokenBucket(rate=50.0, capacity=1)
+        bucket.try_acquire()
+
+        start = time.monotonic()
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        bucket.pause(0.08)
+        await waiter
+
+        assert time.monotonic() - start >= 0.07
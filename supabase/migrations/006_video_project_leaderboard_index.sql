@@ -0,0 +1,24 @@
+-- ========================================
+-- Migration 006: Video Project Leaderboard Index
+-- Created: 2026-10-16
+-- Purpose: Index-only scan for get_video_performance_comparison
+--          (ORDER BY total_clicks DESC LIMIT n, no full sort of the view)
+-- ========================================
+
+-- Covering index: every column the leaderboard selects is in the index
+-- NOTE: not CONCURRENTLY so it can run inside the SQL editor's transaction;
+-- the view has one row per project, so the build lock is short
+CREATE INDEX IF NOT EXISTS ix_mv_vpp_clicks_desc
+    ON mv_video_project_performance(total_clicks DESC)
+    INCLUDE (project_id, title, youtube_url, thumbnail_url, unique_visitors, total_links, created_at);
+
+-- Keep planner statistics current for the new index
+ANALYZE mv_video_project_performance;
+
+-- ========================================
+-- Notes:
+-- ========================================
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY keeps this index up to date.
+-- If mv_video_project_performance is ever dropped and recreated (as in 005),
+-- this index must be recreated too.
+-- ========================================
@@ -0,0 +1,23 @@
+-- ========================================
+-- Migration 007: Flat Project Links View
+-- Created: 2026-10-16
+-- Purpose: Join project_links with urls server-side so get_project_links
+--          gets flat rows (no nested urls(...) embedding to flatten in Python)
+-- ========================================
+
+CREATE OR REPLACE VIEW v_project_links_flat AS
+SELECT
+    pl.project_id,
+    pl.added_at,
+    u.id,
+    u.short_code,
+    u.original_url,
+    u.title,
+    u.click_count,
+    u.created_at
+FROM project_links pl
+JOIN urls u ON u.id = pl.url_id;
+
+COMMENT ON VIEW v_project_links_flat IS 'Project links joined with their URL, one flat row per link';
+
+-- Filtering by project_id uses idx_project_links_project_id (migration 004)
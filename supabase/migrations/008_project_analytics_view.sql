@@ -0,0 +1,31 @@
+-- ========================================
+-- Migration 008: Project Analytics View
+-- Created: 2026-10-16
+-- Purpose: One query for a project's analytics, including projects that
+--          are not in mv_video_project_performance yet (zero stats)
+-- ========================================
+
+CREATE OR REPLACE VIEW v_project_analytics AS
+SELECT
+    p.id AS project_id,
+    p.title,
+    p.youtube_url,
+    p.youtube_video_id,
+    p.thumbnail_url,
+    p.created_at,
+    COALESCE(mv.total_links, 0) AS total_links,
+    COALESCE(mv.total_clicks, 0) AS total_clicks,
+    COALESCE(mv.unique_visitors, 0) AS unique_visitors,
+    COALESCE(mv.countries_reached, 0) AS countries_reached,
+    COALESCE(mv.mobile_clicks, 0) AS mobile_clicks,
+    COALESCE(mv.desktop_clicks, 0) AS desktop_clicks,
+    COALESCE(mv.tablet_clicks, 0) AS tablet_clicks,
+    mv.last_click_at,
+    mv.first_click_at
+FROM video_projects p
+LEFT JOIN mv_video_project_performance mv ON mv.project_id = p.id;
+
+COMMENT ON VIEW v_project_analytics IS 'Per-project analytics from mv_video_project_performance, zeros for projects not in the view yet';
+
+-- Lookups by project_id use the video_projects primary key and
+-- mv_video_project_performance_unique_idx (migration 005)
@@ -0,0 +1,81 @@
+-- ========================================
+-- Migration 009: Click Analytics RPC
+-- Created: 2026-10-16
+-- Purpose: Aggregate a short URL's clicks in Postgres and return one JSON
+--          object, instead of shipping every click row to Python
+-- ========================================
+
+CREATE OR REPLACE FUNCTION get_click_analytics(p_short_code TEXT)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH c AS (
+        SELECT * FROM clicks WHERE short_code = p_short_code
+    ),
+    hours AS (
+        SELECT EXTRACT(HOUR FROM clicked_at AT TIME ZONE 'UTC')::INT AS hour, COUNT(*) AS n
+        FROM c GROUP BY 1
+    ),
+    days AS (
+        SELECT TRIM(TO_CHAR(clicked_at AT TIME ZONE 'UTC', 'Day')) AS day, COUNT(*) AS n
+        FROM c GROUP BY 1
+    )
+    SELECT jsonb_build_object(
+        'total_clicks', (SELECT COUNT(*) FROM c),
+        'unique_visitors', (SELECT COUNT(DISTINCT NULLIF(session_id, '')) FROM c),
+        'returning_visitors', (SELECT COUNT(*) FROM c WHERE is_returning_visitor),
+
+        -- Facets: NULL or empty values are grouped as 'Unknown'
+        'device_breakdown', (
+            SELECT COALESCE(jsonb_object_agg(k, n), '{}'::jsonb) FROM (
+                SELECT COALESCE(NULLIF(device_type, ''), 'Unknown') AS k, COUNT(*) AS n FROM c GROUP BY 1
+            ) s
+        ),
+        'country_breakdown', (
+            SELECT COALESCE(jsonb_object_agg(k, n), '{}'::jsonb) FROM (
+                SELECT COALESCE(NULLIF(country_name, ''), 'Unknown') AS k, COUNT(*) AS n FROM c GROUP BY 1
+            ) s
+        ),
+        'platform_breakdown', (
+            SELECT COALESCE(jsonb_object_agg(k, n), '{}'::jsonb) FROM (
+                SELECT COALESCE(NULLIF(platform, ''), 'Unknown') AS k, COUNT(*) AS n FROM c GROUP BY 1
+            ) s
+        ),
+        'referrer_breakdown', (
+            SELECT COALESCE(jsonb_object_agg(k, n), '{}'::jsonb) FROM (
+                SELECT COALESCE(NULLIF(referrer_type, ''), 'Unknown') AS k, COUNT(*) AS n FROM c GROUP BY 1
+            ) s
+        ),
+        'city_breakdown', (
+            SELECT COALESCE(jsonb_object_agg(k, n), '{}'::jsonb) FROM (
+                SELECT city || ', ' || COALESCE(country_code, 'XX') AS k, COUNT(*) AS n
+                FROM c WHERE city <> '' GROUP BY 1
+            ) s
+        ),
+        'video_sources', (
+            SELECT COALESCE(jsonb_object_agg(k, n), '{}'::jsonb) FROM (
+                SELECT video_platform || ':' || video_id AS k, COUNT(*) AS n
+                FROM c WHERE video_platform <> '' AND video_id <> '' GROUP BY 1
+            ) s
+        ),
+
+        'time_patterns', jsonb_build_object(
+            'hour_distribution', (SELECT COALESCE(jsonb_object_agg(hour, n), '{}'::jsonb) FROM hours),
+            'day_distribution', (SELECT COALESCE(jsonb_object_agg(day, n), '{}'::jsonb) FROM days),
+            'peak_hour', (SELECT hour FROM hours ORDER BY n DESC, hour LIMIT 1),
+            'peak_day', (SELECT day FROM days ORDER BY n DESC, day LIMIT 1)
+        ),
+
+        -- Last 50 clicks for the dashboard table
+        'recent_clicks', (
+            SELECT COALESCE(jsonb_agg(to_jsonb(r) ORDER BY r.clicked_at DESC), '[]'::jsonb) FROM (
+                SELECT * FROM c ORDER BY clicked_at DESC LIMIT 50
+            ) r
+        )
+    );
+$$;
+
+COMMENT ON FUNCTION get_click_analytics IS 'Analytics summary for one short code (breakdowns, time patterns, recent clicks) as JSON';
+
+-- Filtering by short_code uses idx_clicks_short_code (schema.sql)
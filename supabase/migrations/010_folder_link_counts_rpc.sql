@@ -0,0 +1,18 @@
+-- ========================================
+-- Migration 010: Folder Link Counts RPC
+-- Created: 2026-10-16
+-- Purpose: Link count for every folder in one GROUP BY, so the folder tree
+--          doesn't issue one count query per folder
+-- ========================================
+
+CREATE OR REPLACE FUNCTION folder_link_counts()
+RETURNS TABLE (folder_id UUID, link_count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT fl.folder_id, COUNT(*) AS link_count
+    FROM folder_links fl
+    GROUP BY fl.folder_id;
+$$;
+
+COMMENT ON FUNCTION folder_link_counts IS 'Number of links per folder (folders without links are omitted)';
@@ -0,0 +1,37 @@
+-- ========================================
+-- Migration 011: Click Access Path Indexes
+-- Created: 2026-10-16
+-- Purpose: Indexes matching the click queries the repositories run
+--          (per-URL history, per-short-code analytics and its keyset paging)
+-- ========================================
+
+-- urls: get_by_short_code filters short_code AND is_active, already served
+-- by the partial idx_urls_short_code (schema.sql); nothing to add
+
+-- ClickRepository.get_by_url_id: WHERE url_id = ? ORDER BY clicked_at DESC LIMIT n
+-- (one btree descent, no sort)
+CREATE INDEX IF NOT EXISTS idx_clicks_url_time
+    ON clicks(url_id, clicked_at DESC);
+
+-- ClickRepository._iter_click_pages: WHERE short_code = ? AND id > ? ORDER BY id
+-- INCLUDE covers SUMMARY_COLUMNS, so the fallback's keyset pages can be
+-- index-only scans. get_click_analytics (009/012) still reads the heap: its
+-- CTE selects * and recent_clicks returns whole rows; it only gets the
+-- short_code filter from this index
+CREATE INDEX IF NOT EXISTS idx_clicks_short_code_id
+    ON clicks(short_code, id)
+    INCLUDE (session_id, is_returning_visitor, device_type, country_name, country_code,
+             city, platform, referrer_type, video_platform, video_id, clicked_at);
+
+-- Keep planner statistics current for the new indexes
+ANALYZE clicks;
+
+-- ========================================
+-- Notes:
+-- ========================================
+-- NOT CONCURRENTLY so the file runs as-is in the SQL editor's transaction
+-- (same as 006). On a large clicks table, run each CREATE INDEX on its own
+-- as CREATE INDEX CONCURRENTLY to avoid blocking inserts during the build.
+-- idx_clicks_short_code (schema.sql) is kept: it is a prefix of the new
+-- index, but dropping it is left for when pg_stat_user_indexes shows it unused.
+-- ========================================